@@ -16,23 +16,141 @@ __author__ = "Mark Orszycki <morszyck@cisco.com>"
 __copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
 __license__ = "Cisco Sample Code License, Version 1.1"
 
-import queue
-import threading
+import asyncio
+import hashlib
+import pickle
+import sys
 import time
-import traceback
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from pathlib import Path
+from typing import NamedTuple
 
 import wxcadm
 
-from database.crud import CRUDOperations
+from database.crud import CRUDOperations, call_crud, perm_cache, user_caches_lock, user_cache_generations
 from database.db import SessionLocal
 from funcs import (
+    GEOLOCATION_TIMEOUT,
     is_geolocation_timeout,
     is_token_expired,
     is_refresh_token_expired
 )
 from logger.logrr import lm
 
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+
+# Bounded pool for the blocking XSI SDK / DB calls made while handling events
+xsi_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="xsi")
+last_update_key = itemgetter('last_update')  # C-level key function for picking the latest geolocation entry
+XSI_INIT_WORKERS = 16  # Concurrent per-person XSI initializations on startup, bounded to avoid overwhelming the Webex API
+XSI_USER_MAP_CACHE_DIR = Path.home() / '.cache' / 'webex_xsi'  # On-disk cache of the xsi_user_map, one file per org
+XSI_USER_MAP_CACHE_TTL = 24 * 60 * 60  # Seconds before the cached xsi_user_map is rebuilt from the Webex API
+
+class UserEntry(NamedTuple):
+    """
+    Details of a monitored user, stored as the values of CallMonitor.xsi_user_map.
+    """
+    remote_party_name: str  # Display name of the person
+    xsi_user_id: str  # XSI user ID
+    webex_user_id: str  # Webex user ID
+    phone_number: str  # Primary direct number
+    extension: str  # Extension of the primary number
+    xsi_instance: object  # Live wxcadm.xsi.XSI instance for the user
+
+
+# Call event types handled by the monitor, mapped to the call direction relative to the internal user
+CALL_RECEIVED_EVENT = sys.intern("xsi:CallReceivedEvent")
+CALL_ORIGINATED_EVENT = sys.intern("xsi:CallOriginatedEvent")
+CALL_EVENT_DIRECTIONS = {
+    CALL_RECEIVED_EVENT: "inbound",
+    CALL_ORIGINATED_EVENT: "outbound",
+}
+
+# Key paths into the xmltodict-parsed XSI event for each field used by the call handlers
+EVENT_DETAIL_PATHS = {
+    "event_type": ('xsi:Event', 'xsi:eventData', '@xsi1:type'),
+    "call_id": ('xsi:Event', 'xsi:eventData', 'xsi:call', 'xsi:callId'),
+    "user_id": ('xsi:Event', 'xsi:eventData', 'xsi:call', 'xsi:remoteParty', 'xsi:userId'),
+    "target_id": ('xsi:Event', 'xsi:targetId'),
+}
+
+
+def xsi_user_map_cache_path(org_id):
+    """Return the cache file path for the given org."""
+    cache_key = hashlib.blake2b(org_id.encode()).hexdigest()
+    return XSI_USER_MAP_CACHE_DIR / f"{cache_key}.pkl"
+
+
+def load_xsi_user_map_cache(cache_path):
+    """
+    Load the cached user details (without XSI instances) keyed by Webex user ID.
+    Returns an empty dict if the cache is missing, stale or unreadable.
+    """
+    try:
+        if time.time() - cache_path.stat().st_mtime > XSI_USER_MAP_CACHE_TTL:
+            return {}
+        with cache_path.open('rb') as cache_file:
+            return pickle.load(cache_file)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        lm.lnp(f"Ignoring unreadable XSI user map cache {cache_path}: {e}", style="warning", level="warning")
+        return {}
+
+
+def save_xsi_user_map_cache(cache_path, xsi_user_map):
+    """Persist the xsi_user_map, minus the live XSI instances, keyed by Webex user ID."""
+    cached_entries = {
+        entry.webex_user_id: {key: value for key, value in entry._asdict().items() if key != 'xsi_instance'}
+        for entry in xsi_user_map.values()
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with cache_path.open('wb') as cache_file:
+            pickle.dump(cached_entries, cache_file)
+    except OSError as e:
+        lm.lnp(f"Failed to write XSI user map cache {cache_path}: {e}", style="warning", level="warning")
+
+
+def invalidate_xsi_user_map_cache():
+    """Drop all cached xsi_user_maps, e.g. after personnel changes in the org."""
+    for cache_path in XSI_USER_MAP_CACHE_DIR.glob('*.pkl'):
+        cache_path.unlink(missing_ok=True)
+
+
+def walk_event_path(event, path):
+    """
+    Follow a key path through the nested event dict, returning None as soon as a level is missing.
+    """
+    node = event
+    for key in path:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+        if node is None:
+            return None
+    return node
+
+
+class AsyncQueueAdapter:
+    """
+    Adapter exposing the synchronous queue.Queue ``put`` interface expected by wxcadm.XSIEvents.open_channel,
+    forwarding call events onto an asyncio.Queue owned by the given event loop. Events the monitor ignores are
+    dropped on the channel thread so they never wake the event loop.
+    """
+
+    def __init__(self, loop, async_queue):
+        self.loop = loop
+        self.async_queue = async_queue
+
+    def put(self, item, block=True, timeout=None):
+        """Thread safe hand-off of an event from the XSI channel thread to the event loop."""
+        if walk_event_path(item, EVENT_DETAIL_PATHS["event_type"]) in CALL_EVENT_DIRECTIONS:
+            self.loop.call_soon_threadsafe(self.async_queue.put_nowait, item)
+
+    def put_nowait(self, item):
+        self.put(item)
 
 
 class CallMonitor:
@@ -44,8 +162,10 @@ class CallMonitor:
         access_token (str): Webex API access token.
         webex (wxcadm.Webex): Webex API instance.
         all_people (list): List of all people in the organization.
-        xsi_user_map (dict): Mapping of person ID to their display name and ID.
-        call_to_user_map (dict): Mapping of call to user.
+        xsi_user_map (dict): Mapping of XSI user ID to their UserEntry.
+        webex_to_xsi (dict): Reverse index of Webex user ID to XSI user ID.
+        phone_to_xsi (dict): Reverse index of direct phone number to XSI user ID.
+        call_to_user_map (dict): Mapping of call ID to (XSI user ID, wxcadm Call) for calls awaiting a permission decision.
 
     Methods:
         extract_event_details(event: dict) -> dict:
@@ -58,17 +178,19 @@ class CallMonitor:
             Checks if the user has permission to make a call.
         handle_internal_call(xsi_user_id: str, xsi_target_id: str, call_id: str) -> None:
             Handles a call where both parties are internal.
-        handle_external_call(internal_xsi_user_id: str, call_id: str, event_type: str) -> None:
+        handle_external_call(internal_xsi_user_id: str, call_id: str, direction: str) -> None:
             Handles a call where one party is external.
         handle_call_event(event_details: dict) -> None:
             Handles a call event.
         handle_event(event: dict) -> None:
             Handles an event.
-        monitor_calls(events_queue: queue.Queue) -> None:
+        monitor_calls(events_queue: asyncio.Queue) -> None:
             Monitors all calls for the Webex organization.
-        setup_xsi_events() -> None:
-            Initializes XSI events and sets up a thread to monitor calls continuously.
+        setup_xsi_events() -> bool:
+            Initializes XSI events and schedules a task to monitor calls continuously.
     """
+    __slots__ = ('access_token', 'webex', 'all_people', 'xsi_user_map', 'webex_to_xsi', 'phone_to_xsi', 'call_to_user_map',
+                 'monitor_task')
 
     def __init__(self, access_token):
         """
@@ -80,38 +202,70 @@ class CallMonitor:
         self.webex = wxcadm.Webex(access_token)  # Initialize XSI API
         self.webex.org.get_xsi_endpoints()  # Fetch the XSI endpoints for the organization
         self.all_people = self.webex.org.wxc_people  # Fetch all people in the organization
-        self.xsi_user_map = {}  # Mapping of person ID to their display name and ID
-        self.call_to_user_map = {}  # Track / map call to user
-
-        # Initialize the xsi_user_map with users and their respective details.
-        for person in self.all_people:
-            person.start_xsi()  # Start the XSI for each person
-            person_id = person.id  # Fetch the person ID
-            xsi_instance = wxcadm.xsi.XSI(parent=person)  # Create the XSI instance for each person
-
-            phone_numbers_info = person.wxc_numbers.get('phoneNumbers', []) if isinstance(person.wxc_numbers, dict) else []  # Fetch the phone numbers for the person
-            primary_phone_number = next((pn for pn in phone_numbers_info if pn.get('primary', False)),
-                                        phone_numbers_info[0] if phone_numbers_info else None)  # Fetch the primary phone number
-            direct_number = primary_phone_number.get('directNumber') if primary_phone_number else "No number available"  # Fetch the direct number
-            extension = primary_phone_number.get('extension') if primary_phone_number and 'extension' in primary_phone_number else ""  # Fetch the extension
-
-            profile_info = xsi_instance.profile  # Fetch the profile information for the XSI user instance
-            xsi_user_id = profile_info.get('user_id')  # Fetch the xsi user ID
-
-            # Store the user details in the xsi_user_map for easy access
-            self.xsi_user_map[xsi_user_id] = {
-                "remote_party_name": person.name,
-                "xsi_user_id": xsi_user_id,  # Store the XSI user ID
-                "webex_user_id": person_id,  # Store the Webex user ID
-                "phone_number": direct_number,  # Store the concatenated phone number and extension
-                "extension": extension,  # Store the extension
-                "xsi_instance": xsi_instance,  # Store the XSI instance
-                # "profile_info": profile_info  # Store all the profile information
-            }
+        self.call_to_user_map = {}  # Track / map call to user and live Call
+        self.monitor_task = None  # asyncio task consuming XSI events
+
+        # Reuse user details cached from a previous start; only the live XSI instances are re-created for cached users
+        cache_path = xsi_user_map_cache_path(self.webex.org.id)
+        cached_entries = load_xsi_user_map_cache(cache_path)
+
+        # Initialize the xsi_user_map with users and their respective details. Each person needs several blocking
+        # Webex round-trips, so fan out over a bounded thread pool.
+        with ThreadPoolExecutor(max_workers=XSI_INIT_WORKERS, thread_name_prefix="xsi-init") as executor:
+            self.xsi_user_map = dict(executor.map(
+                lambda person: self._init_person(person, cached_entries.get(person.id)), self.all_people
+            ))  # Mapping of XSI user ID to the UserEntry details
+
+        if any(person.id not in cached_entries for person in self.all_people):
+            save_xsi_user_map_cache(cache_path, self.xsi_user_map)
+
+        # Build reverse indices once so lookups by Webex user ID or phone number are O(1)
+        self.webex_to_xsi = {entry.webex_user_id: xsi_user_id for xsi_user_id, entry in self.xsi_user_map.items()}
+        self.phone_to_xsi = {entry.phone_number: xsi_user_id for xsi_user_id, entry in self.xsi_user_map.items()
+                             if entry.phone_number != "No number available"}
 
         lm.print_xsi_user_map(self.xsi_user_map)  # Print the XSI user map
         lm.lnp(f"\nCall Monitoring Initiated for {len(self.xsi_user_map)} users.")  # Print the number of users being monitored
 
+    @staticmethod
+    def _init_person(person, cached_entry=None):
+        """
+        Start XSI for a person and build their xsi_user_map entry.
+        Args:
+            person (wxcadm.Person): The Webex Calling person.
+            cached_entry (dict, optional): The person's user details from the on-disk cache.
+        Returns:
+            tuple: The XSI user ID and the user details.
+        """
+        person.start_xsi()  # Start the XSI for each person
+        person_id = person.id  # Fetch the person ID
+        xsi_instance = wxcadm.xsi.XSI(parent=person)  # Create the XSI instance for each person
+
+        if cached_entry:  # Skip the number and profile lookups, the XSI instance holds live session state so is always new
+            return cached_entry['xsi_user_id'], UserEntry(**cached_entry, xsi_instance=xsi_instance)
+
+        try:
+            phone_numbers_info = person.wxc_numbers['phoneNumbers']  # Fetch the phone numbers for the person
+        except (TypeError, KeyError):
+            phone_numbers_info = []  # wxc_numbers was not a dict or had no phone numbers
+        primary_phone_number = next((pn for pn in phone_numbers_info if pn.get('primary', False)),
+                                    phone_numbers_info[0] if phone_numbers_info else None)  # Fetch the primary phone number
+        direct_number = primary_phone_number.get('directNumber') if primary_phone_number else "No number available"  # Fetch the direct number
+        extension = primary_phone_number.get('extension') if primary_phone_number and 'extension' in primary_phone_number else ""  # Fetch the extension
+
+        profile_info = xsi_instance.profile  # Fetch the profile information for the XSI user instance
+        xsi_user_id = profile_info.get('user_id')  # Fetch the xsi user ID
+
+        # Return the user details to be stored in the xsi_user_map for easy access
+        return xsi_user_id, UserEntry(
+            remote_party_name=person.name,
+            xsi_user_id=xsi_user_id,  # Store the XSI user ID
+            webex_user_id=person_id,  # Store the Webex user ID
+            phone_number=direct_number,  # Store the concatenated phone number and extension
+            extension=extension,  # Store the extension
+            xsi_instance=xsi_instance,  # Store the XSI instance
+        )
+
     @staticmethod
     def extract_event_details(event):
         """
@@ -120,22 +274,7 @@ class CallMonitor:
             event (dict): The event data.
         """
         try:
-            event_data = event.get('xsi:Event', {}).get('xsi:eventData', {})
-            event_type = event_data.get('@xsi1:type', {})
-            call_info = event_data.get('xsi:call', {})
-            xsitargetId = event.get('xsi:Event', {}).get('xsi:targetId', {})
-            call_id = call_info.get('xsi:callId', '')
-            remote_party_info = call_info.get('xsi:remoteParty', {})
-            userId = remote_party_info.get('xsi:userId', {})
-            remote_party_name = remote_party_info.get('xsi:name', '').lower()
-            userDN = remote_party_info.get('xsi:userDN', {}).get('#text', '') or remote_party_info.get('xsi:address', {}).get('#text', '')
-
-            event_details = {
-                "event_type": event_type,
-                "call_id": call_id,
-                "user_id": userId,
-                "target_id": xsitargetId,
-            }
+            event_details = {name: walk_event_path(event, path) for name, path in EVENT_DETAIL_PATHS.items()}
 
             # lm.lnp(f"Event details: {event_details}", style="webex")
             return event_details
@@ -144,7 +283,13 @@ class CallMonitor:
             return {}
 
     @staticmethod
-    def check_user_permission(user_id):
+    def fetch_allow_list_entry(user_id):
+        """
+        Fetch the allow list entry for the user (blocking DB call, run in the executor).
+        """
+        return call_crud(CRUDOperations.get_allow_list_entry_by_user_id, user_id=user_id)  # On the executor thread's session, removed afterwards
+
+    async def check_user_permission(self, user_id):
         """
         Check if the user has permission to make a call.
         :param user_id:
@@ -152,26 +297,39 @@ class CallMonitor:
         :return:
         :rtype:
         """
-        session = SessionLocal()  # Create a new session
-        crud = CRUDOperations(session)  # Create a CRUDOperations instance
-        user_allow_list_entry = crud.get_allow_list_entry_by_user_id(user_id=user_id)  # Fetch the allow list entry for the user
-
+        now = time.time()
+        with user_caches_lock:
+            cached = perm_cache.get(user_id)  # (allowed, expires_at) from a previous lookup
+            generation = user_cache_generations.get(user_id, 0)  # Taken before the fetch, see the store below
+        if cached and now < cached[1]:
+            return cached[0]  # Decision cannot have changed yet, skip the DB round-trip
+
+        loop = asyncio.get_running_loop()
+        user_allow_list_entry = await loop.run_in_executor(xsi_executor, self.fetch_allow_list_entry, user_id)
+
+        allowed = False
+        expires_at = now + GEOLOCATION_TIMEOUT  # Re-check blocked users at least once per timeout period
         if user_allow_list_entry and user_allow_list_entry['geolocation_data']:  # Check if the user is in the allow list and has geolocation data
-            latest_time_location = max(user_allow_list_entry['geolocation_data'], key=lambda x: x['last_update'])  # Fetch the latest geolocation data
+            latest_time_location = max(user_allow_list_entry['geolocation_data'], key=last_update_key)  # Fetch the latest geolocation data
             if latest_time_location:
-                lm.lnp(f"Latest geolocation data for user {user_id}: {latest_time_location}")
+                lm.lnp("Latest geolocation data for user %s: %s", user_id, latest_time_location)
                 if not is_geolocation_timeout(latest_time_location):
-                    lm.lnp(f"ALLOWED: User {user_id} is within geolocation update period.", style="success")
-                    return True  # Return True if the user is within the geolocation update period
+                    lm.lnp("ALLOWED: User %s is within geolocation update period.", user_id, style="success")
+                    allowed = True  # The user is within the geolocation update period
+                    expires_at = latest_time_location['last_update'] + GEOLOCATION_TIMEOUT  # Moment the decision flips to blocked
                 else:
-                    lm.lnp(f"BLOCKED: User {user_id}'s geolocation update has timed out.", style="error")
+                    lm.lnp("BLOCKED: User %s's geolocation update has timed out.", user_id, style="error")
             else:
-                lm.lnp(f"No geolocation data found for user {user_id}.", style="error")
+                lm.lnp("No geolocation data found for user %s.", user_id, style="error")
         else:
-            lm.lnp(f"User {user_id} is not in the allow list or has no geolocation data.", style="error")
-        return False  # Return False if the user is not in the allow list or has no geolocation data
+            lm.lnp("User %s is not in the allow list or has no geolocation data.", user_id, style="error")
 
-    def reject_call(self, user_id, call_id):
+        with user_caches_lock:
+            if user_cache_generations.get(user_id, 0) == generation:  # A location committed during the fetch must not be masked for GEOLOCATION_TIMEOUT
+                perm_cache[user_id] = (allowed, expires_at)
+        return allowed  # False if the user is not in the allow list or has no valid geolocation data
+
+    async def reject_call(self, user_id, call_id):
         """
         Reject the call for the given user_id and call_id
         Args:
@@ -181,37 +339,40 @@ class CallMonitor:
             :param user_id:
             :type user_id:
         """
-        # Retrieve the XSI instance associated with the user ID from the xsi_user_map
-        user_entry = self.xsi_user_map.get(user_id)
-        if not user_entry:
+        # Resolve the live Call registered for the call ID, so the hangup is a single XSI request
+        user_id, call = self.call_to_user_map.pop(call_id, (user_id, None))
+        if call is None:
+            call = self.build_call(user_id, call_id)
+        if call is None:
             lm.logger.error(f"No XSI instance found for User ID: {user_id}")
             return
 
-        xsi_instance = user_entry.get('xsi_instance')
-        if xsi_instance:
-            try:
-                # Use the XSI instance to end the call
-                active_calls = xsi_instance.calls
-                for call in active_calls:
-                    try:
-                        call.hangup()
-                        lm.lnp(f"Ended call with Call ID: {call.id}")
-                    except Exception as e:
-                        lm.lnp(f"Failed to end the call with Call ID: {call_id}. Error: {e}")
-            except Exception as e:
-                lm.lnp(f"Failed to end the call with Call ID: {call_id}. Error: {e}")
-        else:
-            lm.lnp(f"No active call found for Call ID: {call_id}.")
+        try:
+            # End only the blocked call, leaving the user's other calls untouched
+            await asyncio.get_running_loop().run_in_executor(xsi_executor, call.hangup)
+            lm.lnp(f"Ended call with Call ID: {call_id}")
+        except Exception as e:
+            lm.lnp(f"Failed to end the call with Call ID: {call_id}. Error: {e}")
+
+    def build_call(self, user_id, call_id):
+        """
+        Build a wxcadm Call handle for the call_id on the user's XSI instance, without listing the user's calls.
+        Returns None if the user has no XSI instance.
+        """
+        user_entry = self.xsi_user_map.get(user_id)
+        if not user_entry or not user_entry.xsi_instance:
+            return None
+        return wxcadm.xsi.Call(user_entry.xsi_instance, id=call_id)
 
     def register_call(self, call_id, user_id):
         """
-        Associate a given call_id with a user_id.
+        Associate a given call_id with a user_id and the live Call used to end it.
         Args:
             call_id (str): The unique ID of the call.
-            user_id (str): The ID of the user.
+            user_id (str): The XSI ID of the user.
         """
-        lm.lnp(f"Associating Call ID {call_id} with User ID {user_id}")
-        self.call_to_user_map[call_id] = user_id
+        lm.lnp("Associating Call ID %s with User ID %s", call_id, user_id)
+        self.call_to_user_map[call_id] = (user_id, self.build_call(user_id, call_id))
 
     def handle_internal_call(self, xsi_user_id, xsi_target_id, call_id):
         """
@@ -220,29 +381,36 @@ class CallMonitor:
         caller_entry = self.xsi_user_map.get(xsi_user_id) if xsi_user_id else None
         receiver_entry = self.xsi_user_map.get(xsi_target_id) if xsi_target_id else None
         if caller_entry and receiver_entry:
-            lm.lnp(f"Both parties are internal, allowing call {call_id}")
+            lm.lnp("Both parties are internal, allowing call %s", call_id)
 
-    def handle_external_call(self, internal_xsi_user_id, call_id, event_type):
+    async def handle_external_call(self, internal_xsi_user_id, call_id, direction):
         """
         Handle a call where one party is external.
+        Args:
+            direction (str): 'inbound' or 'outbound', resolved from the event type by handle_event.
         """
         entry = self.xsi_user_map.get(internal_xsi_user_id)
-        internal_webex_user_id = entry.get('webex_user_id') if entry else None
+        internal_webex_user_id = entry.webex_user_id if entry else None
+        if not internal_webex_user_id:
+            return
+        self.register_call(call_id, internal_xsi_user_id)  # Track the call while its permission is checked
 
-        if event_type == "xsi:CallReceivedEvent" and internal_webex_user_id:
-            if self.check_user_permission(internal_webex_user_id):
-                lm.lnp(f"External to internal call (inbound) and internal user {internal_webex_user_id} is in country, allowing call {call_id}")
+        if direction == "inbound":
+            if await self.check_user_permission(internal_webex_user_id):
+                self.call_to_user_map.pop(call_id, None)  # Allowed, no longer needs tracking
+                lm.lnp("External to internal call (inbound) and internal user %s is in country, allowing call %s", internal_webex_user_id, call_id)
             else:
-                lm.lnp(f"External to internal call and internal user {internal_webex_user_id} is out of country, blocking call {call_id}")
-                self.reject_call(internal_xsi_user_id, call_id)
-        elif event_type == "xsi:CallOriginatedEvent" and internal_webex_user_id:
-            if self.check_user_permission(internal_webex_user_id):
-                lm.lnp(f"Internal to External call (outbound) and internal user {internal_webex_user_id} is in country; allowing call {call_id}")
+                lm.lnp("External to internal call and internal user %s is out of country, blocking call %s", internal_webex_user_id, call_id)
+                await self.reject_call(internal_xsi_user_id, call_id)
+        elif direction == "outbound":
+            if await self.check_user_permission(internal_webex_user_id):
+                self.call_to_user_map.pop(call_id, None)  # Allowed, no longer needs tracking
+                lm.lnp("Internal to External call (outbound) and internal user %s is in country; allowing call %s", internal_webex_user_id, call_id)
             else:
-                lm.lnp(f"Internal to External call and internal user {internal_webex_user_id} is out of country; blocking call {call_id}")
-                self.reject_call(internal_xsi_user_id, call_id)
+                lm.lnp("Internal to External call and internal user %s is out of country; blocking call %s", internal_webex_user_id, call_id)
+                await self.reject_call(internal_xsi_user_id, call_id)
 
-    def handle_event(self, event):
+    async def handle_event(self, event):
         """
         Handle an event.
         """
@@ -254,53 +422,55 @@ class CallMonitor:
             lm.lnp("Event details could not be extracted.")
             return  # Early return if event_details is empty
         try:
-            if event_type in ["xsi:CallReceivedEvent", "xsi:CallOriginatedEvent"]:  # Check if the event type is a call event
-                lm.lnp(f"Processing {event_type}. Details: {event_details}")
+            direction = CALL_EVENT_DIRECTIONS.get(event_type)  # None if the event type is not a call event
+            if direction:  # Check if the event type is a call event
+                lm.lnp("Processing %s. Details: %s", event_type, event_details)
                 call_id = event_details.get('call_id')  # Fetch the call ID
                 xsi_user_id = event_details.get('user_id')  # Fetch the user ID
                 xsi_target_id = event_details.get('target_id')  # Fetch the target ID
 
-                lm.lnp(f"Handling call event. Type: {event_type}, Call ID: {call_id}, Caller: {xsi_user_id}, Call Receiver: {xsi_target_id}")
+                lm.lnp("Handling call event. Type: %s, Call ID: %s, Caller: %s, Call Receiver: %s", event_type, call_id, xsi_user_id, xsi_target_id)
                 internal_xsi_user_id = xsi_target_id if xsi_target_id else xsi_user_id  # Fetch the internal user ID
 
                 if xsi_user_id and xsi_target_id:  # Both Internal check
                     # lm.lnp("Both calls internal... handling")
                     self.handle_internal_call(xsi_user_id, xsi_target_id, call_id)
                 elif internal_xsi_user_id:  # Caller external check
-                    self.handle_external_call(xsi_target_id, call_id, event_type)
+                    await self.handle_external_call(xsi_target_id, call_id, direction)
                 else:
-                    lm.lnp(f"Unhandled event type {event_type}")
+                    lm.lnp("Unhandled event type %s", event_type)
         except Exception as e:
-            lm.lnp(f"Error handling call event {e}", style='error')
-            traceback.print_exc()
+            lm.logger.exception("Error handling call event")  # Traceback is only formatted if a handler accepts the record
+            lm.tsp(f"Error handling call event {e}", style='error')
 
-    def monitor_calls(self, events_queue):
+    async def monitor_calls(self, events_queue):
         """
         Monitor all calls for the Webex organization.
         Args:
-            events_queue (queue.Queue): The queue storing the events.
+            events_queue (asyncio.Queue): The queue storing the events.
         """
         # lm.lnp('monitor_calls called')
 
         while True:  # Start an infinite loop to get the messages as they are placed in Queue
             try:
-                event = events_queue.get()  # Get the event from the queue
+                event = await events_queue.get()  # Get the event from the queue
                 if event:
-                    self.handle_event(event)  # Handle the event
-                    time.sleep(0.5)
+                    await self.handle_event(event)  # Handle the event
             except Exception as e:
-                lm.lnp(traceback.format_exc(), style='debug')
-                lm.lnp(f"Error in the monitoring loop: {e}", style="error", level="error")
+                lm.logger.exception("Error in the monitoring loop")  # Traceback is only formatted if a handler accepts the record
+                lm.tsp(f"Error in the monitoring loop: {e}", style="error")
 
-    def setup_xsi_events(self):
-        """Initialize XSI events and set up a thread to monitor calls continuously."""
+    async def setup_xsi_events(self):
+        """Initialize XSI events and schedule a task to monitor calls continuously."""
         try:
             lm.lnp("Initializing CallMonitor with provided access token.")
 
-            events = wxcadm.XSIEvents(self.webex.org)
-            events_queue = queue.Queue()
-            channel = events.open_channel(events_queue)
-            subscription_response = channel.subscribe("Advanced Call")  # Subscribe to the Advanced Call event package
+            loop = asyncio.get_running_loop()
+            events_queue = asyncio.Queue()
+            # wxcadm's channel setup and subscription are blocking HTTP calls, run them on the XSI executor like the hangups
+            events = await loop.run_in_executor(xsi_executor, wxcadm.XSIEvents, self.webex.org)
+            channel = await loop.run_in_executor(xsi_executor, events.open_channel, AsyncQueueAdapter(loop, events_queue))  # wxcadm pushes events from its own thread
+            subscription_response = await loop.run_in_executor(xsi_executor, channel.subscribe, "Advanced Call")  # Subscribe to the Advanced Call event package
 
             if subscription_response:
                 lm.lnp(f"Subscribed to 'Advanced Call' event package {subscription_response}", level="info")
@@ -308,12 +478,11 @@ class CallMonitor:
                 lm.lnp("Failed to subscribe to 'Advanced Call' event package.", level="error")
                 return False
 
-            lm.lnp("Starting thread to monitor calls...", style="info", level="info")
-            monitor_thread = threading.Thread(target=self.monitor_calls, args=(events_queue,), daemon=True)
-            monitor_thread.start()
+            lm.lnp("Starting task to monitor calls...", style="info", level="info")
+            self.monitor_task = asyncio.create_task(self.monitor_calls(events_queue))
 
-            if monitor_thread.is_alive():
-                lm.lnp("Event monitoring thread is running.", style="success", level="info")
+            if not self.monitor_task.done():
+                lm.lnp("Event monitoring task is running.", style="success", level="info")
                 lm.lnp("\n")
                 lm.p_panel(
                     "[bright_red]Call Monitoring has been started for the organization...[/bright_red]",
@@ -323,7 +492,7 @@ class CallMonitor:
                 )
                 return True
             else:
-                lm.lnp("Event monitoring thread failed to start.", level="error")
+                lm.lnp("Event monitoring task failed to start.", level="error")
                 return False
         except Exception as e:
             lm.logger.exception("Failed to setup webex call monitoring: ", exc_info=e)
@@ -350,14 +519,14 @@ async def start_call_monitoring():
         token_valid, admin_access_token = await check_token(db)  # Check if the admin token is valid
         if not token_valid:
             lm.logger.error("Invalid or expired admin token.")
-            return JSONResponse(content={"message": "Invalid or expired admin token"}, status_code=403)
+            return ORJSONResponse(content={"message": "Invalid or expired admin token"}, status_code=403)
 
         lm.logger.info("Admin token in DB is valid, starting call monitoring")
-        call_monitor = CallMonitor(admin_access_token)
-        call_monitor.setup_xsi_events()  # Setup monitoring of XSI events
-        return JSONResponse(content={"message": "Call monitoring started successfully"}, status_code=200)
+        call_monitor = await asyncio.get_running_loop().run_in_executor(None, CallMonitor, admin_access_token)  # Org/XSI load is blocking, keep it off the event loop
+        await call_monitor.setup_xsi_events()  # Setup monitoring of XSI events
+        return ORJSONResponse(content={"message": "Call monitoring started successfully"}, status_code=200)
     except Exception as e:
         lm.logger.error(f"Failed to initiate call monitoring: {e}")
-        return JSONResponse(status_code=500, content={"message": f"Failed to initiate call monitoring: {str(e)}"})
+        return ORJSONResponse(status_code=500, content={"message": f"Failed to initiate call monitoring: {str(e)}"})
     finally:
         db.close()
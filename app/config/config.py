@@ -19,14 +19,16 @@ __license__ = "Cisco Sample Code License, Version 1.1"
 import importlib
 import pathlib
 import secrets
-from typing import Optional, ClassVar, Dict, Any
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import ClassVar, Mapping, Any
 from dotenv import dotenv_values
 from pathlib import Path
 
 
 class Config:
-    _instance: ClassVar[Optional['Config']] = None
-    env_vars: Dict[str, Any] = {}  # Initializing as a class attribute
+    env_vars: Mapping[str, Any] = MappingProxyType({})  # Initializing as a class attribute
 
     # DIR PATHS
     DIR_PATH: ClassVar[pathlib.Path] = pathlib.Path(__file__).parents[2]
@@ -36,7 +38,7 @@ class Config:
 
     def __init__(self):
         # Load only the variables defined in the .env file
-        self.env_vars = dotenv_values(self.ENV_FILE_PATH)
+        self.env_vars = dict(dotenv_values(self.ENV_FILE_PATH))
         for key, value in self.env_vars.items():
             setattr(self, key, value)
 
@@ -53,27 +55,57 @@ class Config:
             self.USER_REDIRECT_URI = None
             self.ADMIN_REDIRECT_URI = None
 
+        # Seal the resolved config: read-only view of the values, no further attribute writes
+        self.env_vars = MappingProxyType(self.env_vars)
+        object.__setattr__(self, '_sealed', True)
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_sealed', False):
+            raise AttributeError(f"Config is read-only, cannot set '{name}'. Use Config.reload_config() to pick up changes.")
+        super().__setattr__(name, value)
+
     def _load_settings_vars(self):
-        for attribute_name in dir(self.settings_module):
-            if not attribute_name.startswith('__') and not attribute_name.endswith('__'):
-                attribute_value = getattr(self.settings_module, attribute_name)
-                # Filter out functions and classes, only load non-callable attributes
-                if not callable(attribute_value):
-                    setattr(self, attribute_name, attribute_value)
+        # Only names defined in the settings module itself; filter out private names, functions and classes (e.g. typing.List)
+        settings_vars = {name: value for name, value in vars(self.settings_module).items()
+                         if not name.startswith('_') and not callable(value)}
+        for attribute_name, attribute_value in settings_vars.items():
+            setattr(self, attribute_name, attribute_value)
 
-                    # Add to Environment Variable Dict for printing
-                    self.env_vars[attribute_name] = attribute_value
+        # Add to Environment Variable Dict for printing
+        self.env_vars.update(settings_vars)
 
     @classmethod
+    @lru_cache(maxsize=1)
     def get_instance(cls):
-        if cls._instance is None:
-            cls._instance = cls()
-        return cls._instance
+        return cls()
 
     @classmethod
     def reload_config(cls):
-        cls._instance = None  # Reset the singleton instance
+        cls.get_instance.cache_clear()  # Reset the singleton instance
         return cls.get_instance()
 
 
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Immutable snapshot of the settings read on hot paths (geolocation checks), resolved once at startup.
+    """
+    lat_min: float
+    lat_max: float
+    lon_min: float
+    lon_max: float
+    geolocation_timeout: int
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'Settings':
+        return cls(
+            lat_min=config.LAT_MIN,
+            lat_max=config.LAT_MAX,
+            lon_min=config.LON_MIN,
+            lon_max=config.LON_MAX,
+            geolocation_timeout=config.GEOLOCATION_TIMEOUT,
+        )
+
+
 c = Config.get_instance()  # Singleton instance of Config
+SETTINGS = Settings.from_config(c)  # Frozen hot-path settings
@@ -12,6 +12,13 @@ APP_NAME: str = 'Webex Call Blocking by Geolocation'
 APP_VERSION: str = 'POC v1.0'
 UVICORN_LOG_LEVEL: str = 'WARNING'
 
+# Database Settings
+RUN_MIGRATIONS: bool = True  # Create missing tables / indexes and migrate the schema on startup; set False once the database is set up
+
+# Rate Limiting Settings (slowapi / limits notation)
+OAUTH_RATE_LIMIT: str = '10/minute'  # Per client IP on the OAuth login / callback routes
+GEOLOCATION_RATE_LIMIT: str = '100/minute'  # Per session token on /update-time-location-db
+
 # Webex Integration URLs
 AUTHORIZATION_BASE_URL = 'https://api.ciscospark.com/v1/authorize'
 TOKEN_URL = 'https://api.ciscospark.com/v1/access_token'
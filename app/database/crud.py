@@ -16,64 +16,228 @@ __author__ = "Mark Orszycki <morszyck@cisco.com>"
 __copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
 __license__ = "Cisco Sample Code License, Version 1.1"
 
-from datetime import datetime, timezone, timedelta
-from threading import local
-
+import asyncio
+import time as time_module
+from functools import partial
+from threading import Lock
+from typing import Any, Dict, List, Tuple, Union
+
+from sqlalchemy import select, update, delete, bindparam, lambda_stmt, inspect, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, scoped_session
 
 from app.logger.logrr import lm
-from app.database.models import AdminToken, UserList, AllowList, TimeLocation
+from app.database.db import ScopedSession
+from app.database.models import AdminToken, UserList, AllowList, GEOLOCATION_COLUMNS
+
+
+# Call permission decisions cached by CallMonitor, keyed by user_id -> (allowed, expires_at)
+perm_cache: Dict[str, Tuple[bool, float]] = {}
+user_caches_lock = Lock()  # Guards perm_cache and allow_list_cache
+
+
+# AllowList entries (with their geolocation data) keyed by user_id, invalidated after every committed write to AllowList
+allow_list_cache: Dict[str, dict] = {}
+
+# Per-user invalidation counter (also guarded by user_caches_lock). Readers take it before their SELECT and only store
+# the result if it is unchanged, so a row read before a concurrent write commits is never cached after its invalidation
+user_cache_generations: Dict[str, int] = {}
+
+# Admin token read from the database, invalidated when the admin token is replaced or deleted
+ADMIN_TOKEN_EXPIRY_MARGIN = 30  # Seconds before expires_at after which the cached admin token is re-read
+admin_token_cache: Dict[str, Any] = {"value": None}
+admin_token_cache_lock = Lock()
+
+ALLOW_LIST_ENTRY_EXPIRY = 300.0  # Seconds without a geolocation update after which a user is removed from the AllowList
+
+
+def invalidate_user_caches(user_id: str):
+    """ Drop the cached allow list entry and call permission decision for the user after a committed write to their allow list / geolocation data """
+    with user_caches_lock:
+        perm_cache.pop(user_id, None)
+        allow_list_cache.pop(user_id, None)
+        user_cache_generations[user_id] = user_cache_generations.get(user_id, 0) + 1
+
+
+def get_cached_admin_token():
+    """ The cached admin token (a copy), or None if it is not cached, was replaced or is about to expire """
+    with admin_token_cache_lock:
+        cached_token = admin_token_cache["value"]
+    if cached_token and time_module.time() < (cached_token["expires_at"] or 0) - ADMIN_TOKEN_EXPIRY_MARGIN:
+        return dict(cached_token)
+    return None
+
+
+def invalidate_admin_token_cache():
+    """ Drop the cached admin token after its replacement or deletion has been committed """
+    with admin_token_cache_lock:
+        admin_token_cache["value"] = None
+
+
+# Hot read statements, built once so the statement construction and SQL compilation are cached across calls.
+# They select only the columns the readers return, so rows come back as plain tuples without ORM instances.
+SELECT_ADMIN_TOKEN = lambda_stmt(lambda: select(
+    AdminToken.access_token, AdminToken.expires_in, AdminToken.refresh_token, AdminToken.refresh_token_expires_in,
+    AdminToken.token_type, AdminToken.scope, AdminToken.expires_at, AdminToken.session_token
+).limit(1))
+SELECT_USER_LIST_BY_USER_ID = lambda_stmt(lambda: select(UserList.user_id, UserList.session_token).where(UserList.user_id == bindparam('user_id')))
+SELECT_USER_LIST_BY_SESSION_TOKEN = lambda_stmt(lambda: select(UserList.user_id, UserList.session_token).where(UserList.session_token == bindparam('session_token')))
+SELECT_USER_AND_ALLOW_STATUS_BY_SESSION_TOKEN = lambda_stmt(lambda: select(
+    UserList.user_id, AllowList.user_id.is_not(None).label('has_allow')
+).outerjoin(AllowList, AllowList.user_id == UserList.user_id).where(UserList.session_token == bindparam('session_token')))
+SELECT_ALLOW_LIST = lambda_stmt(lambda: select(
+    AllowList.user_id, AllowList.allow_caller, AllowList.time, AllowList.latitude, AllowList.longitude, AllowList.last_update
+))
+SELECT_ALLOW_LIST_ENTRY_BY_USER_ID = lambda_stmt(lambda: select(
+    AllowList.user_id, AllowList.allow_caller, AllowList.time, AllowList.latitude, AllowList.longitude, AllowList.last_update
+).where(AllowList.user_id == bindparam('user_id')))
+SELECT_STALE_ALLOW_LIST_USER_IDS = lambda_stmt(lambda: select(AllowList.user_id).where(AllowList.last_update < bindparam('cutoff')))
+
+# Write statements, built once as well. No ORM instances are loaded by the callers, so session synchronization is skipped.
+DELETE_ADMIN_TOKENS = delete(AdminToken).execution_options(synchronize_session=False)
+DELETE_ALLOW_LIST_ENTRIES_BY_USER_IDS = delete(AllowList).where(
+    AllowList.user_id.in_(bindparam('user_ids', expanding=True))
+).execution_options(synchronize_session=False)
+CLEAR_GEOLOCATION_BY_USER_ID = update(AllowList).where(AllowList.user_id == bindparam('target_user_id')).values(
+    {column: None for column in GEOLOCATION_COLUMNS}
+).execution_options(synchronize_session=False)
+
+
+def fold_time_locations_into_allow_list(engine):
+    """
+    One-off migration for databases created before the geolocation columns were folded into AllowList: adds the
+    columns to allow_list, copies each user's most recent time_locations row onto their AllowList entry and drops
+    time_locations.
+
+    Args:
+        engine: The SQLAlchemy engine.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table('time_locations'):
+        return
+    existing_columns = {column['name'] for column in inspector.get_columns('allow_list')}
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as connection:
+        for name in GEOLOCATION_COLUMNS:
+            if name not in existing_columns:
+                column_type = AllowList.__table__.c[name].type.compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE allow_list ADD COLUMN {quote(name)} {column_type}"))
+        # time_locations may hold several rows per user: copy every column from the same, most recently updated one
+        latest_row_id = ("SELECT l.id FROM time_locations l WHERE l.user_id = allow_list.user_id "
+                         "ORDER BY l.last_update DESC, l.id DESC LIMIT 1")
+        assignments = ', '.join(
+            f"{quote(name)} = (SELECT t.{quote(name)} FROM time_locations t WHERE t.id = ({latest_row_id}))" for name in GEOLOCATION_COLUMNS
+        )
+        connection.execute(text(f"UPDATE allow_list SET {assignments} WHERE user_id IN (SELECT user_id FROM time_locations)"))
+        connection.execute(text("DROP TABLE time_locations"))
+    lm.lnp("Migrated time_locations into the allow_list table.")
+
+
+def geolocation_data(entry) -> List[dict]:
+    """ Geolocation data list of an AllowList entry / row: its latest location, or empty before the first update """
+    if entry.time is None:
+        return []
+    return [{"time": entry.time, "latitude": entry.latitude, "longitude": entry.longitude, "last_update": entry.last_update}]
 
 
 def extract_access_token(token_object):
     """ Extract Webex access token from token object """
-    if token_object and "access_token" in token_object:
-        return token_object["access_token"]
-    else:
+    access_token = token_object.get("access_token") if token_object else None  # Single dict lookup
+    if access_token is None:
         raise ValueError("Access token not found in the provided token object.")
+    return access_token
 
 
 class CRUDOperations:
     """
-    Class for performing CRUD operations on the database.
+    Class for performing CRUD operations on the database. Lightweight session holder; scoped_crud is the shared
+    instance over the thread-local sessions, create one only for an explicit session.
 
     Attributes:
-        _instance (CRUDOperations): The instance of the CRUDOperations class.
-        _local (local): The threading.local object.
+        db (Session | scoped_session): The database session (or scoped session registry) the operations run on.
     """
-    _instance = None
-    _local = local()
+    __slots__ = ('db',)
 
-    def __new__(cls, *args, **kwargs):
-        if not isinstance(cls._instance, cls):
-            cls._instance = super(CRUDOperations, cls).__new__(cls)
-        return cls._instance
-
-    def __init__(self, db: Session):
-        self._local.db = db
-
-    @property
-    def db(self):
-        return self._local.db
+    def __init__(self, db: Union[Session, scoped_session]):
+        self.db = db
 
     def commit_db(self, db_item, operation_name):
         """
-        Common command call. Commits the db_item to the database and handles any SQLAlchemyError.
+        Common command call for new items. Adds the db_item to the session, commits it and rolls back on SQLAlchemyError.
+        Changes to items already in the session (updates, deletes) are committed with commit_pending instead.
 
         Args:
             db_item: The database item to commit.
             operation_name (str): The name of the operation being performed.
+
+        Returns:
+            The committed db_item, or None if the commit failed.
         """
         self.db.add(db_item)
         try:
             self.db.commit()
         except SQLAlchemyError as e:
-            lm.lnp(f"Error occurred while committing {operation_name} to the database: {e}")
+            self.db.rollback()  # Leave the session usable for the next operation on this thread
+            lm.lnp(f"Error occurred while committing {operation_name} to the database: {e}", level="error", style="error")
+            return None
         return db_item
 
+    def commit_pending(self, operation_name):
+        """
+        Commits all pending changes in the session (updates, deletes, bulk and upsert operations) without adding
+        any item to the session, rolling back on SQLAlchemyError.
+
+        Args:
+            operation_name (str): The name of the operation being performed.
+
+        Returns:
+            True if the changes were committed, False if the commit failed and was rolled back.
+        """
+        try:
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            lm.lnp(f"Error occurred while committing {operation_name} to the database: {e}", level="error", style="error")
+            return False
+        return True
+
+    def insert(self, model):
+        """
+        Dialect-specific INSERT construct for the model (PostgreSQL or SQLite), which supports ON CONFLICT clauses.
+
+        Args:
+            model: The model class.
+        """
+        insert = postgresql_insert if self.db.get_bind().dialect.name == 'postgresql' else sqlite_insert
+        return insert(model)
+
+    def upsert(self, model, rows: List[dict], operation_name: str):
+        """
+        Inserts the rows, updating the existing row on a primary key / unique user_id conflict, as a single
+        INSERT ... ON CONFLICT DO UPDATE statement, then commits.
+
+        Args:
+            model: The model class (keyed by user_id).
+            rows (list): Dicts of column values, each including user_id.
+            operation_name (str): The name of the operation being performed.
+
+        Returns:
+            True if the rows were committed (or there were none), False if the commit failed.
+        """
+        if not rows:
+            return True
+        stmt = self.insert(model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id'],
+            set_={column: stmt.excluded[column] for column in rows[0] if column != 'user_id'}
+        )
+        self.db.execute(stmt)
+        return self.commit_pending(operation_name)
+
     def create_admin_token(self, access_token: str, expires_in: int, refresh_token: str, refresh_token_expires_in: int, token_type: str,
-                           scope: list, expires_at: float, session_token: str):
+                           scope: Union[str, List[str]], expires_at: float, session_token: str):
         """
         Creates a new AdminToken entry in the database.
 
@@ -83,11 +247,11 @@ class CRUDOperations:
             refresh_token (str): The refresh token.
             refresh_token_expires_in (int): The duration in seconds that the refresh token is valid.
             token_type (str): The type of the token.
-            scope (str): The scope of the token.
+            scope (str | list): The scope of the token, space separated or as the OAuth scope list.
             expires_at (float): The timestamp when the token expires.
         """
-        # Convert the scope list to a string
-        scope_str = ' '.join(scope)
+        # Store the scope as a space separated string, joining only when the caller passed the OAuth scope list
+        scope_str = scope if isinstance(scope, str) else ' '.join(scope)
 
         db_item = AdminToken(
             access_token=access_token,
@@ -99,31 +263,31 @@ class CRUDOperations:
             expires_at=expires_at,
             session_token=session_token,
         )
-        return self.commit_db(db_item=db_item, operation_name='create_admin_token')
+        committed_item = self.commit_db(db_item=db_item, operation_name='create_admin_token')
+        if committed_item is not None:
+            invalidate_admin_token_cache()  # Only once the new token is committed, so a concurrent read cannot cache the old one
+        return committed_item
 
     def read_admin_token(self):
         """
         Retrieves the AdminToken entry from the database.
         """
-        admin_token_entry = self.db.query(AdminToken).first()
-        if admin_token_entry is not None:
-            admin_token_data = {
-                "access_token": admin_token_entry.access_token,
-                "expires_in": admin_token_entry.expires_in,
-                "refresh_token": admin_token_entry.refresh_token,
-                "refresh_token_expires_in": admin_token_entry.refresh_token_expires_in,
-                "token_type": admin_token_entry.token_type,
-                "scope": admin_token_entry.scope,
-                "expires_at": admin_token_entry.expires_at,
-                "session_token": admin_token_entry.session_token
-            }
+        cached_token = get_cached_admin_token()
+        if cached_token is not None:
+            return cached_token  # Token has not been replaced and is not about to expire, skip the SELECT
+
+        admin_token_row = self.db.execute(SELECT_ADMIN_TOKEN).first()
+        if admin_token_row is not None:
+            admin_token_data = admin_token_row._asdict()
             # lm.lnp(f"Retrieved admin token from the database: {admin_token_data}")
+            with admin_token_cache_lock:
+                admin_token_cache["value"] = dict(admin_token_data)
             return admin_token_data
         else:
             lm.lnp("No admin token entry found.", level="warning", style="warning")
             return None
 
-    def update_admin_token(self, access_token: str, expires_in: int, refresh_token: str, refresh_token_expires_in: int, token_type: str, scope: list, expires_at: float,
+    def update_admin_token(self, access_token: str, expires_in: int, refresh_token: str, refresh_token_expires_in: int, token_type: str, scope: Union[str, List[str]], expires_at: float,
                            session_token: str):
         """
         Replaces the admin token in the database. Deletes all existing entries and adds a new one.
@@ -134,21 +298,23 @@ class CRUDOperations:
             refresh_token (str): The refresh token.
             refresh_token_expires_in (int): The duration in seconds that the refresh token is valid.
             token_type (str): The type of the token.
-            scope (str): The scope of the token.
+            scope (str | list): The scope of the token, space separated or as the OAuth scope list.
             expires_at (float): The timestamp when the token expires.
         """
-        self.delete_all_admin_tokens()
+        self.delete_all_admin_tokens(commit=False)  # Delete and insert are committed together by create_admin_token
         return self.create_admin_token(access_token, expires_in, refresh_token, refresh_token_expires_in, token_type, scope, expires_at, session_token)
 
-    def delete_all_admin_tokens(self):
+    def delete_all_admin_tokens(self, commit: bool = True):
         """
         Deletes all AdminToken entries from the database.
+
+        Args:
+            commit (bool): Commit the deletion; pass False to leave it pending in the current transaction (the
+                caller's commit then invalidates the cached admin token).
         """
-        self.db.query(AdminToken).delete()
-        try:
-            self.db.commit()
-        except SQLAlchemyError as e:
-            lm.lnp(f"Error occurred while deleting all admin tokens from the database: {e}", level="error", style="error")
+        self.db.execute(DELETE_ADMIN_TOKENS)
+        if commit and self.commit_pending('delete_all_admin_tokens'):
+            invalidate_admin_token_cache()
 
     def get_admin_access_token(self):
         admin_token_object = self.read_admin_token()
@@ -180,44 +346,49 @@ class CRUDOperations:
             session_token (str, optional): The session token.
         """
         if user_id:
-            user_list_entry = self.db.query(UserList).filter(UserList.user_id == user_id).first()
+            user_list_row = self.db.execute(SELECT_USER_LIST_BY_USER_ID, {'user_id': user_id}).first()
             search_param = user_id
             search_type = 'user ID'
         elif session_token:
-            user_list_entry = self.db.query(UserList).filter(UserList.session_token == session_token).first()
+            user_list_row = self.db.execute(SELECT_USER_LIST_BY_SESSION_TOKEN, {'session_token': session_token}).first()
             search_param = session_token
             search_type = 'session token'
         else:
             raise ValueError("Either user_id or session_token must be provided.")
 
-        if user_list_entry is not None:
-            user_list_data = {
-                "user_id": user_list_entry.user_id,
-                "session_token": user_list_entry.session_token
-            }
+        if user_list_row is not None:
+            user_list_data = user_list_row._asdict()
             # lm.lnp(f"Retrieved user list from the database: {user_list_data}")
             return user_list_data
         else:
             lm.lnp(f"No user list entry found for the provided {search_type}: {search_param}")
             return None
 
+    def get_user_and_allow_status(self, session_token: str):
+        """
+        Resolves a session token to its user and whether that user has an AllowList entry, with one JOIN query.
+
+        Args:
+            session_token (str): The session token.
+
+        Returns:
+            A dictionary with user_id and has_allow, or None if the session token is unknown.
+        """
+        row = self.db.execute(SELECT_USER_AND_ALLOW_STATUS_BY_SESSION_TOKEN, {'session_token': session_token}).first()
+        if row is None:
+            lm.lnp(f"No user list entry found for the provided session token: {session_token}")
+            return None
+        return row._asdict()
+
     def update_user_list_entry(self, user_id: str, session_token: str):
         """
-        Updates an existing UserList entry in the database.
+        Updates the UserList entry in the database, creating it if it does not exist (single UPSERT statement).
 
         Args:
-            db (Session): The database session.
             user_id (str): The user ID.
             session_token (str): The session token.
         """
-        db_item = self.db.query(UserList).filter(UserList.user_id == user_id).first()
-
-        if db_item:
-            # If a user exists, update the session_token
-            db_item.session_token = session_token
-            return self.commit_db(db_item=db_item, operation_name='update_user_list_entry')
-        else:
-            raise ValueError(f"No UserList entry found for user_id: {user_id}")
+        self.upsert(UserList, [{"user_id": user_id, "session_token": session_token}], operation_name='update_user_list_entry')
 
     def delete_user_list_entry(self, user_id: str):
         """
@@ -227,12 +398,12 @@ class CRUDOperations:
             user_id (str): The user ID.
         """
         # Query for the entry
-        db_item = self.db.query(UserList).filter(UserList.user_id == user_id).first()
+        db_item = self.db.get(UserList, user_id)
 
         # If the entry exists, delete it
         if db_item:
             self.db.delete(db_item)
-            return self.commit_db(db_item=db_item, operation_name='delete_user_list_entry')
+            self.commit_pending('delete_user_list_entry')
 
     def create_allow_list_entry(self, user_id: str, allow_caller: bool):
         """
@@ -243,51 +414,57 @@ class CRUDOperations:
             user_id (str): The user ID.
             allow_caller (bool): Whether the user is allowed to call.
         """
-
         db_item = AllowList(
             user_id=user_id, allow_caller=allow_caller
         )
-        self.db.add(db_item)
-        return self.commit_db(db_item=db_item, operation_name='create_allow_list_entry')
+        committed_item = self.commit_db(db_item=db_item, operation_name='create_allow_list_entry')
+        if committed_item is not None:
+            invalidate_user_caches(user_id)
+        return committed_item
+
+    def add_allow_list_entry_if_missing(self, user_id: str, allow_caller: bool) -> bool:
+        """
+        Creates the AllowList entry unless the user already has one, as a single INSERT ... ON CONFLICT DO NOTHING
+        statement; an existing entry is left untouched.
+
+        Args:
+            user_id (str): The user ID.
+            allow_caller (bool): Whether the user is allowed to call, for a new entry.
+
+        Returns:
+            True if the entry was created.
+        """
+        stmt = self.insert(AllowList).values(user_id=user_id, allow_caller=allow_caller).on_conflict_do_nothing(index_elements=['user_id'])
+        created = self.db.execute(stmt).rowcount == 1
+        created = self.commit_pending('add_allow_list_entry_if_missing') and created
+        if created:
+            invalidate_user_caches(user_id)
+        return created
 
     def update_allow_list_entry(self, user_id: str, allow_caller: bool):
         """
-        Updates an existing AllowList entry in the database.
+        Updates the AllowList entry in the database, creating it if it does not exist (single UPSERT statement).
 
         Args:
             user_id (str): The user ID.
             allow_caller (bool): Whether the user is allowed to call.
         """
-        db_item = self.db.query(AllowList).filter(AllowList.user_id == user_id).first()
-
-        if db_item:
-            # If a user exists, update the allow_caller
-            db_item.allow_caller = allow_caller
-            return self.commit_db(db_item=db_item, operation_name='update_allow_list_entry')
-        else:
-            raise ValueError(f"No AllowList entry found for user_id: {user_id}")
+        if self.upsert(AllowList, [{"user_id": user_id, "allow_caller": allow_caller}], operation_name='update_allow_list_entry'):
+            invalidate_user_caches(user_id)
 
     def read_allow_list(self):
         """
         Retrieves all AllowList entries from the database.
         """
-        allow_list_entries = self.db.query(AllowList).all()
-        if allow_list_entries:
+        rows = self.db.execute(SELECT_ALLOW_LIST).all()  # One result set of plain rows, no ORM instances
+        if rows:
             allow_list_data = [
                 {
-                    "user_id": entry.user_id,
-                    "allow_caller": entry.allow_caller,
-                    "geolocation_data": [
-                        {
-                            "time": time_location.time,
-                            "latitude": time_location.latitude,
-                            "longitude": time_location.longitude,
-                            "last_update": time_location.last_update
-                        }
-                        for time_location in entry.time_locations
-                    ]
+                    "user_id": row.user_id,
+                    "allow_caller": row.allow_caller,
+                    "geolocation_data": geolocation_data(row)
                 }
-                for entry in allow_list_entries
+                for row in rows
             ]
             # lm.pp(f"Retrieved allow list from the database: {allow_list_data}")
             return allow_list_data
@@ -297,31 +474,32 @@ class CRUDOperations:
 
     def get_allow_list_entry_by_user_id(self, user_id: str):
         """
-        Retrieves a specific AllowList entry from the database using the user ID, including the related TimeLocation data.
+        Retrieves a specific AllowList entry from the database using the user ID, including its geolocation data.
 
         Args:
             user_id (str): The user ID for which to retrieve the AllowList entry.
 
         Returns:
-            A dictionary containing the AllowList entry and its related TimeLocation data, or None if not found.
+            A dictionary containing the AllowList entry and its geolocation data, or None if not found.
         """
-        allow_list_entry = self.db.query(AllowList).filter(AllowList.user_id == user_id).first()  # Query for the entry
-        if allow_list_entry:  # If the entry exists
-            # Create a dictionary containing the AllowList entry and its related TimeLocation data
+        with user_caches_lock:
+            cached_entry = allow_list_cache.get(user_id)
+            generation = user_cache_generations.get(user_id, 0)
+        if cached_entry is not None:
+            return cached_entry  # No write since the entry was last read
+
+        row = self.db.execute(SELECT_ALLOW_LIST_ENTRY_BY_USER_ID, {'user_id': user_id}).first()  # Primary key lookup, geolocation data included
+        if row:  # If the entry exists
+            # Create a dictionary containing the AllowList entry and its geolocation data
             allow_list_data = {
-                "user_id": allow_list_entry.user_id,
-                "allow_caller": allow_list_entry.allow_caller,
-                "geolocation_data": [
-                    {
-                        "time": time_location.time,
-                        "latitude": time_location.latitude,
-                        "longitude": time_location.longitude,
-                        "last_update": time_location.last_update
-                    }
-                    for time_location in allow_list_entry.time_locations  # Iterate over the related TimeLocation data
-                ]
+                "user_id": row.user_id,
+                "allow_caller": row.allow_caller,
+                "geolocation_data": geolocation_data(row)
             }
             # lm.pp(f"Retrieved allow list entry from the database: {allow_list_data}")
+            with user_caches_lock:
+                if user_cache_generations.get(user_id, 0) == generation:  # Skip the store if a write was committed meanwhile
+                    allow_list_cache[user_id] = allow_list_data
             return allow_list_data
         else:
             lm.lnp(f"No allow list entry found for user_id: {user_id}.")
@@ -335,18 +513,16 @@ class CRUDOperations:
             db (Session): The database session.
             user_id (str): The user ID.
         """
-        db_item = self.db.query(AllowList).filter(AllowList.user_id == user_id).first()  # Query for the entry
+        db_item = self.db.get(AllowList, user_id)  # Query for the entry
 
         if db_item:
             self.db.delete(db_item)  # If the entry exists, delete it
-            try:
-                self.db.commit()  # Commit the deletion
-            except Exception as e:
-                lm.lnp(f"Error occurred while deleting allow list entry from the database: {e}", level="error", style="error")
+            if self.commit_pending('delete_allow_list_entry'):
+                invalidate_user_caches(user_id)
 
     def create_time_location_entry(self, user_id: str, session_token: str, time: str, latitude: float, longitude: float):
         """
-        Creates a new TimeLocation entry in the database.
+        Stores the user's geolocation data on their AllowList entry, creating the entry if it does not exist.
 
         Args:
             user_id (str): The user ID.
@@ -355,18 +531,11 @@ class CRUDOperations:
             latitude (float): The latitude of the location.
             longitude (float): The longitude of the location.
         """
-        db_item = TimeLocation(
-            user_id=user_id,
-            session_token=session_token,
-            time=time, latitude=latitude,
-            longitude=longitude,
-            last_update=datetime.now(timezone.utc).timestamp()
-        )
-        return self.commit_db(db_item=db_item, operation_name='create_time_location_entry')
+        self.update_time_location_entry(user_id=user_id, session_token=session_token, time=time, latitude=latitude, longitude=longitude)
 
     def update_time_location_entry(self, user_id: str, session_token: str, time: str, latitude: float, longitude: float):
         """
-        Updates an existing TimeLocation entry in the database. If no entry exists, creates a new one.
+        Updates the geolocation data on the user's AllowList entry, creating the entry if it does not exist (single UPSERT statement).
 
         Args:
             user_id (str): The user ID.
@@ -375,54 +544,95 @@ class CRUDOperations:
             latitude (float): The latitude of the location.
             longitude (float): The longitude of the location.
         """
-        db_item = self.db.query(TimeLocation).filter(TimeLocation.user_id == user_id).first()
+        self.update_time_location_entries([{
+            "user_id": user_id,
+            "session_token": session_token,
+            "time": time,
+            "latitude": latitude,
+            "longitude": longitude,
+            "last_update": time_module.time(),
+        }])
 
-        if db_item:
-            # If a TimeLocation entry exists, update the fields
-            db_item.session_token = session_token
-            db_item.time = time
-            db_item.latitude = latitude
-            db_item.longitude = longitude
-            db_item.last_update = datetime.now(timezone.utc).timestamp()
-            return self.commit_db(db_item=db_item, operation_name='update_time_location_entry')
-        else:
-            # If no TimeLocation entry exists for the user_id, create a new one
-            return self.create_time_location_entry(user_id=user_id, session_token=session_token, time=time, latitude=latitude, longitude=longitude)
+    def update_time_location_entries(self, entries: List[dict]):
+        """
+        Applies a batch of geolocation updates to the AllowList as a single UPSERT statement, creating entries for users that have none.
+        allow_caller is left untouched on existing entries.
+
+        Args:
+            entries (list): Dicts with user_id, session_token, time, latitude, longitude and last_update keys.
+
+        Returns:
+            True if the batch was committed, False if the commit failed.
+        """
+        latest_entries = {entry['user_id']: entry for entry in entries}  # Only the most recent update per user, a row may only be upserted once per statement
+        if not self.upsert(AllowList, list(latest_entries.values()), operation_name='update_time_location_entries'):
+            return False
+        for user_id in latest_entries:
+            invalidate_user_caches(user_id)  # After the commit, so a concurrent permission check cannot cache the old decision
+        return True
 
     def delete_time_location_entry(self, user_id: str):
         """
-        Deletes the TimeLocation entry from the database using the user ID.
+        Clears the geolocation data on the user's AllowList entry.
 
         Args:
             user_id (str): The user ID.
         """
-        # Query for the entry
-        db_item = self.db.query(TimeLocation).filter(TimeLocation.user_id == user_id).first()
-
-        # If the entry exists, delete it
-        if db_item:
-            self.db.delete(db_item)
-            return self.commit_db(db_item=db_item, operation_name='delete_time_location_entry')
+        self.db.execute(CLEAR_GEOLOCATION_BY_USER_ID, {'target_user_id': user_id})
+        if self.commit_pending('delete_time_location_entry'):
+            invalidate_user_caches(user_id)
 
     def remove_expired_allow_list_entries(self):
         """
-        Iterates over all entries in the AllowList table, checks the last_update field of the related TimeLocation entry,
-        and removes the user from the AllowList if the last_update is more than 5 minutes ago.
+        Removes every user from the AllowList whose last geolocation update is more than 5 minutes ago, using a single
+        set-based DELETE statement instead of a query per user.
         """
-        # Get the current time
-        current_time = datetime.now(timezone.utc)
+        cutoff = time_module.time() - ALLOW_LIST_ENTRY_EXPIRY  # last_update is stored as a UNIX timestamp, compare floats directly
+        stale_user_ids = self.db.execute(SELECT_STALE_ALLOW_LIST_USER_IDS, {'cutoff': cutoff}).scalars().all()
+        if not stale_user_ids:
+            return
+
+        try:
+            self.db.execute(DELETE_ALLOW_LIST_ENTRIES_BY_USER_IDS, {'user_ids': stale_user_ids})
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            lm.lnp(f"Error occurred while removing expired allow list entries from the database: {e}", level="error", style="error")
+            return
+
+        for user_id in stale_user_ids:
+            invalidate_user_caches(user_id)
+
+
+# Process-wide instance bound to the scoped_session registry itself: every call is proxied to the calling thread's
+# session, so one instance serves all executor threads and nothing is constructed per call.
+scoped_crud = CRUDOperations(ScopedSession)
 
-        # Get all entries from the AllowList table
-        allow_list_entries = self.read_allow_list()
 
-        for entry in allow_list_entries:
-            # Get the related TimeLocation entry
-            time_location_entry = self.db.query(TimeLocation).filter(TimeLocation.user_id == entry.user_id).first()
+def call_crud(operation, *args, **kwargs):
+    """
+    Run a CRUDOperations method on the calling thread's scoped session and remove the session afterwards (blocking).
+    The call is the transaction scope of the route: anything it left uncommitted is rolled back if it raises, so the
+    routes need no rollback handling of their own.
+
+    Args:
+        operation: The unbound CRUDOperations method, e.g. CRUDOperations.read_user_list.
+    """
+    try:
+        return operation(scoped_crud, *args, **kwargs)
+    except Exception:
+        ScopedSession.rollback()
+        raise
+    finally:
+        ScopedSession.remove()
 
-            if time_location_entry:
-                # Calculate the time difference between the current time and the last update
-                time_difference = current_time - datetime.fromtimestamp(time_location_entry.last_update, tz=timezone.utc)
 
-                # If the last update was more than 5 minutes ago, remove the user from the AllowList
-                if time_difference > timedelta(minutes=5):
-                    self.delete_allow_list_entry(user_id=entry.user_id)
+async def run_crud(operation, *args, **kwargs):
+    """
+    Await a CRUDOperations method from a route without blocking the event loop: the blocking DB call runs on a
+    worker thread of the default executor, with that thread's own session.
+
+    Args:
+        operation: The unbound CRUDOperations method, e.g. CRUDOperations.read_user_list.
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, partial(call_crud, operation, *args, **kwargs))
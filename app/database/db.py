@@ -16,13 +16,35 @@ __author__ = "Mark Orszycki <morszyck@cisco.com>"
 __copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
 __license__ = "Cisco Sample Code License, Version 1.1"
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
 from app.config.config import c
 
 SQLALCHEMY_DATABASE_URL = c.SQLALCHEMY_DATABASE_URL     # Get the SQLAlchemy database URL from the config
-engine = create_engine(SQLALCHEMY_DATABASE_URL)     # Create the SQLAlchemy engine
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith('sqlite')
+
+if IS_SQLITE:
+    # SQLite connections are shared with the call monitor / writer threads
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        """ WAL journaling with NORMAL sync avoids an fsync per commit """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+else:
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        pool_size=10,   # Persistent connections kept in the pool
+        max_overflow=20,    # Extra connections allowed under burst load
+        pool_recycle=3600,  # Recycle connections hourly to avoid server-side idle timeouts
+        pool_pre_ping=True,     # Transparently replace connections dropped by the server
+    )     # Create the SQLAlchemy engine
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)     # Create the SQLAlchemy session
+ScopedSession = scoped_session(SessionLocal)    # Thread-local sessions for worker threads (call monitor, geolocation writer)
 Base = declarative_base()       # Declare the Base class for SQLAlchemy ORM
 
@@ -16,10 +16,14 @@ __author__ = "Mark Orszycki <morszyck@cisco.com>"
 __copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
 __license__ = "Cisco Sample Code License, Version 1.1"
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Boolean
 from app.database.db import Base
 
+# Bounded column lengths: denser rows and index entries than unbounded TEXT / LONGTEXT columns
+WEBEX_ID_LENGTH = 128  # Base64 encoded Webex user IDs
+SESSION_TOKEN_LENGTH = 64  # secrets.token_urlsafe(32) session tokens are 43 characters
+OAUTH_TOKEN_LENGTH = 4096  # Webex access / refresh tokens
+
 
 class AdminToken(Base):
     """
@@ -28,14 +32,14 @@ class AdminToken(Base):
     """
     __tablename__ = 'admin_tokens'
     id = Column(Integer, primary_key=True, index=True)  # Primary key - index
-    access_token = Column(String, nullable=False)   # Webex access token for the admin user
+    access_token = Column(String(OAUTH_TOKEN_LENGTH), nullable=False)   # Webex access token for the admin user
     expires_in = Column(Integer)    # Expiry time for the access token
-    refresh_token = Column(String)      # Webex refresh token for the admin user
+    refresh_token = Column(String(OAUTH_TOKEN_LENGTH))      # Webex refresh token for the admin user
     refresh_token_expires_in = Column(Integer)  # Expiry time for the refresh token
-    token_type = Column(String)    # Type of token
-    scope = Column(String)   # Scope of the token
+    token_type = Column(String(32))    # Type of token
+    scope = Column(String(1024))   # Scope of the token
     expires_at = Column(Float)  # Expiry time for the access token
-    session_token = Column(String, nullable=False)    # Web session token for the admin user
+    session_token = Column(String(SESSION_TOKEN_LENGTH), nullable=False, index=True)    # Web session token for the admin user - indexed for lookups
 
 
 class UserList(Base):
@@ -44,34 +48,25 @@ class UserList(Base):
     It stores the user_id and session_token for each user.
     """
     __tablename__ = 'user_list'
-    user_id = Column(String, primary_key=True, index=True)  # Primary key - Webex User ID
-    session_token = Column(String, nullable=False)  # Web session token for the user
+    user_id = Column(String(WEBEX_ID_LENGTH), primary_key=True, index=True)  # Primary key - Webex User ID
+    session_token = Column(String(SESSION_TOKEN_LENGTH), nullable=False, index=True)  # Web session token for the user - indexed for session lookups (non-unique, so the index can be created on tables with duplicate tokens)
 
 
 class AllowList(Base):
     """
     This class represents the AllowList table in the database.
-    It stores the user_id and a boolean indicating if the user is allowed to make calls.
-    It also has a relationship with the TimeLocation table.
+    It stores the user_id, a boolean indicating if the user is allowed to make calls, and the user's latest geolocation
+    update (session_token, time, latitude, longitude, last_update). The geolocation columns are NULL until the first update.
     """
     __tablename__ = 'allow_list'
-    user_id = Column(String, primary_key=True, index=True)  # Primary key - Webex User ID
+    user_id = Column(String(WEBEX_ID_LENGTH), primary_key=True, index=True)  # Primary key - Webex User ID
     allow_caller = Column(Boolean, default=False)   # Boolean indicating if the user is allowed to make calls
-    time_locations = relationship("TimeLocation", back_populates="allow_list")  # Relationship to TimeLocation
+    session_token = Column(String(SESSION_TOKEN_LENGTH))  # Web session token the geolocation was sent with
+    time = Column(String(64))   # Time of the location update
+    latitude = Column(Float)    # Latitude of the location
+    longitude = Column(Float)   # Longitude of the location
+    last_update = Column(Float, index=True)     # Last update time - indexed for expiry sweeps
 
 
-class TimeLocation(Base):
-    """
-    This class represents the TimeLocation table in the database.
-    It stores the user_id, session_token, time, latitude, longitude, and last_update for each user.
-    It also has a relationship with the AllowList table.
-    """
-    __tablename__ = 'time_locations'
-    id = Column(Integer, primary_key=True, index=True)  # Primary key - index
-    user_id = Column(String, ForeignKey('allow_list.user_id'), nullable=False)  # Foreign key to UserList - Webex User ID
-    session_token = Column(String, nullable=False)  # Web session token for the user
-    time = Column(String, nullable=False)   # Time of the location update
-    latitude = Column(Float, nullable=False)    # Latitude of the location
-    longitude = Column(Float, nullable=False)   # Longitude of the location
-    last_update = Column(Float, nullable=False)     # Last update time
-    allow_list = relationship("AllowList", back_populates="time_locations")  # Relationship to AllowList
+# Geolocation columns folded into AllowList from the former time_locations table
+GEOLOCATION_COLUMNS = ('session_token', 'time', 'latitude', 'longitude', 'last_update')
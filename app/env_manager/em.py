@@ -16,12 +16,12 @@ __author__ = "Mark Orszycki <morszyck@cisco.com>"
 __copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
 __license__ = "Cisco Sample Code License, Version 1.1"
 
-from dotenv import load_dotenv, set_key
+from dotenv import load_dotenv
 import os
 from pathlib import Path
 import typer
 from app.config.config import c
-from typing import ClassVar, Optional, List
+from typing import ClassVar, Optional, List, Dict
 from rich.console import Console
 
 ENV_FILE_PATH = c.ENV_FILE_PATH
@@ -40,6 +40,7 @@ class EM:
         Initialize the Environment Manager with the path to the .env file.
         """
         self.env_path = ENV_FILE_PATH
+        self.env_loaded = False  # The .env file is parsed into os.environ only once
 
     @classmethod
     def get_instance(cls) -> 'EM':
@@ -54,31 +55,61 @@ class EM:
         """
         Create the .env file if it doesn't exist and load the environment variables from it.
         """
-        if not self.env_path.exists():
-            self.env_path.touch()
-        load_dotenv(dotenv_path=self.env_path)
+        self.env_path.touch(exist_ok=True)
+        self.load_env()
         # console.print(f"Loaded environment variables from {self.env_path}: {os.environ}")
 
+    def load_env(self):
+        """
+        Load the environment variables from the .env file, if not already loaded.
+        """
+        if not self.env_loaded:
+            load_dotenv(dotenv_path=self.env_path)
+            self.env_loaded = True
+
     def ensure_vars_set(self, var_names: List[str]):
         """
         Ensure that the specified environment variables are set and are strings.
         """
-        load_dotenv(dotenv_path=self.env_path)
+        self.load_env()
+        updates = {}
         for var_name in var_names:
             var_value = os.getenv(var_name)
             if var_value is None or not isinstance(var_value, str) or var_value == '':
-                new_value = typer.prompt(f"Please enter a value for {var_name}")
-                os.environ[var_name] = new_value
-                set_key(self.env_path.as_posix(), var_name, new_value, quote_mode="never")
-                load_dotenv(dotenv_path=self.env_path)
+                updates[var_name] = typer.prompt(f"Please enter a value for {var_name}")
             else:
                 console.print(f"{var_name} is already set.", style="bright_green")
 
+        if updates:
+            os.environ.update(updates)
+            self.write_env_updates(updates)
+
+    def write_env_updates(self, updates: Dict[str, str]):
+        """
+        Write the updated variables to the .env file in a single pass, replacing existing (empty) entries and appending new ones.
+        """
+        lines = self.env_path.read_text().splitlines(keepends=True) if self.env_path.exists() else []
+        pending = dict(updates)
+        for i, line in enumerate(lines):
+            var_name = line.split('=', 1)[0].strip()
+            if var_name in pending:
+                lines[i] = f"{var_name}={pending.pop(var_name)}\n"
+        if lines and not lines[-1].endswith('\n'):
+            lines[-1] += '\n'
+        lines.extend(f"{var_name}={value}\n" for var_name, value in pending.items())
+        self.env_path.write_text(''.join(lines))
+
     def ensure_settings_set(self, setting_names: List[str]):
         """
         Ensure that the specified settings are set and are of the correct type.
         """
         settings_file_path = c.SETTINGS_FILE_PATH  # Path to the settings.py file
+        # Read the settings.py file once and index the line of each annotated setting
+        with open(settings_file_path, 'r') as file:
+            lines = file.readlines()
+        line_index = {line.split(':', 1)[0].strip(): i for i, line in enumerate(lines) if ':' in line and not line.startswith('#')}
+        settings_updated = False
+
         for setting_name in setting_names:
             setting_value = getattr(c, setting_name, None)
             if setting_value is None or (setting_name == 'GEOLOCATION_TIMEOUT' and not isinstance(setting_value, int)) or (
@@ -95,20 +126,18 @@ class EM:
                     except ValueError:
                         console.print(f"Invalid value. Please enter a {'integer' if setting_name == 'GEOLOCATION_TIMEOUT' else 'float'} for {setting_name}.",
                                       style="bright_red")
-                # Read the settings.py file
-                with open(settings_file_path, 'r') as file:
-                    lines = file.readlines()
                 # Replace the line that contains the setting
-                for i, line in enumerate(lines):
-                    if line.startswith(setting_name):
-                        lines[i] = f"{setting_name}: {type(new_value).__name__} = {new_value}\n"
-                        break
-                # Write the changes back to the settings.py file
-                with open(settings_file_path, 'w') as file:
-                    file.writelines(lines)
+                if setting_name in line_index:
+                    lines[line_index[setting_name]] = f"{setting_name}: {type(new_value).__name__} = {new_value}\n"
+                    settings_updated = True
             else:
 
                 console.print(f"{setting_name} is already set.", style="bright_green")
 
+        # Write all changes back to the settings.py file at once
+        if settings_updated:
+            with open(settings_file_path, 'w') as file:
+                file.writelines(lines)
+
 
 em = EM.get_instance()
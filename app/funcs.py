@@ -16,43 +16,61 @@ __author__ = "Mark Orszycki <morszyck@cisco.com>"
 __copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
 __license__ = "Cisco Sample Code License, Version 1.1"
 
-import secrets
-from config.config import c
-from datetime import datetime, timezone
+import base64
+import os
+import time
+from threading import Lock
+from config.config import SETTINGS
 from logger.logrr import lm
 
+# Random bytes for session tokens, refilled from os.urandom in SESSION_TOKEN_POOL_SIZE chunks
+SESSION_TOKEN_POOL_SIZE = 4096
+session_token_pool = {"bytes": b"", "offset": 0}
+session_token_pool_lock = Lock()
+
+# Settings used on the geolocation hot path, resolved once at import (SETTINGS is frozen) instead of on every call
+LAT_MIN, LAT_MAX = SETTINGS.lat_min, SETTINGS.lat_max     # Latitude minimum and maximum values for the country
+LON_MIN, LON_MAX = SETTINGS.lon_min, SETTINGS.lon_max     # Longitude minimum and maximum values for the country
+GEOLOCATION_TIMEOUT = SETTINGS.geolocation_timeout     # Timeout in seconds, set in settings.py
+
 
 def in_country(latitude: float, longitude: float):
     """
     Check if given latitude and longitude are within the bounds of the country.
     """
-    LAT_MIN = c.LAT_MIN     # Latitude minimum and maximum values for the country
-    LAT_MAX = c.LAT_MAX     # Latitude minimum and maximum values for the country
-    LON_MIN = c.LON_MIN     # Longitude minimum and maximum values for the country
-    LON_MAX = c.LON_MAX     # Longitude minimum and maximum values for the country
     return LAT_MIN <= latitude <= LAT_MAX and LON_MIN <= longitude <= LON_MAX   # Check if the coordinates are within the bounds
 
 
-def is_geolocation_timeout(geolocation_data):
-    """Check if the geolocation data is outdated."""
-    geolocation_timeout = c.GEOLOCATION_TIMEOUT     # Timeout in seconds, set in .env
-    last_update = geolocation_data.get('last_update')   # Last update time
-    if last_update is None:    # Check if the last update time is missing
-        lm.lnp("No last update time found; defaulting to timeout.", style="warning", level="warning")
-        return True
+def specialize_geolocation_timeout(geolocation_timeout: float):
+    """
+    Build is_geolocation_timeout for a fixed timeout. The timeout and the clock are bound in the closure once,
+    so each check reads them as closure cells instead of module globals.
+    """
+    now = time.time  # Current UNIX time, same epoch as last_update
+
+    def is_geolocation_timeout(geolocation_data):
+        """Check if the geolocation data is outdated."""
+        last_update = geolocation_data.get('last_update')   # Last update time
+        if last_update is None:    # Check if the last update time is missing
+            lm.lnp("No last update time found; defaulting to timeout.", style="warning", level="warning")
+            return True
+
+        if now() - last_update > geolocation_timeout:    # Check if the geolocation data is outdated
+            lm.lnp("Geolocation update for user %s has timed out.", geolocation_data.get('user_id', 'Unknown'), style="warning", level="warning")
+            return True
+        lm.lnp("Geolocation update for user %s is within the allowed period.", geolocation_data.get('user_id', 'Unknown'), style="success", level="info")
+        return False
+
+    return is_geolocation_timeout
+
 
-    current_time = datetime.now(timezone.utc).timestamp()   # Current time in UTC
-    if current_time - last_update > geolocation_timeout:    # Check if the geolocation data is outdated
-        lm.lnp(f"Geolocation update for user {geolocation_data.get('user_id', 'Unknown')} has timed out.", style="warning", level="warning")
-        return True
-    lm.lnp(f"Geolocation update for user {geolocation_data.get('user_id', 'Unknown')} is within the allowed period.", style="success", level="info")
-    return False
+is_geolocation_timeout = specialize_geolocation_timeout(GEOLOCATION_TIMEOUT)  # Specialized for the configured timeout
 
 
 def is_token_expired(token):
     """Check if the token is expired."""
     try:
-        return datetime.now().timestamp() > token.get('expires_at', 0)  # Check if the token has expired
+        return time.time() > token.get('expires_at', 0)  # Check if the token has expired
     except Exception as e:
         lm.lnp(f"Error checking token expiration: {e}", style="error", level="error")
         return True  # Assume the token is expired if an error occurs
@@ -61,16 +79,27 @@ def is_token_expired(token):
 def is_refresh_token_expired(token):
     """Check if the refresh token is expired."""
     try:
+        current_time = time.time()  # Read the clock once, it is also the default acquisition time
         refresh_token_lifespan = token.get('refresh_token_expires_in', 0)  # lifespan in seconds
-        token_acquired_time = token.get('acquired_at', datetime.now().timestamp())  # Time when the token was saved
+        token_acquired_time = token.get('acquired_at', current_time)  # Time when the token was saved
         refresh_token_expiry_time = token_acquired_time + refresh_token_lifespan    # Time when the token will expire
-        return datetime.now().timestamp() > refresh_token_expiry_time   # Check if the token has expired
+        return current_time > refresh_token_expiry_time   # Check if the token has expired
     except Exception as e:
         lm.lnp(f"Error checking refresh token expiration: {e}", style="error", level="error")
         return True  # Assume the refresh token is expired if an error occurs
 
 
 def generate_session_token(token_len: int = 24):
-    """Generate a random session token."""
-    token: str = secrets.token_urlsafe(token_len)
+    """
+    Generate a random session token: token_len bytes from the kernel CSPRNG, URL-safe base64 encoded (same format as
+    secrets.token_urlsafe). Bytes are drawn from a pool refilled with one os.urandom call per SESSION_TOKEN_POOL_SIZE bytes.
+    """
+    with session_token_pool_lock:
+        offset = session_token_pool["offset"]
+        if offset + token_len > len(session_token_pool["bytes"]):  # Pool exhausted, refill it
+            session_token_pool["bytes"] = os.urandom(max(SESSION_TOKEN_POOL_SIZE, token_len))
+            offset = 0
+        token_bytes = session_token_pool["bytes"][offset:offset + token_len]
+        session_token_pool["offset"] = offset + token_len  # Bytes are never handed out twice
+    token: str = base64.urlsafe_b64encode(token_bytes).rstrip(b'=').decode('ascii')
     return token
@@ -0,0 +1,99 @@
+"""
+Copyright (c) 2024 Cisco and/or its affiliates.
+This software is licensed to you under the terms of the Cisco Sample
+Code License, Version 1.1 (the "License"). You may obtain a copy of the
+License at
+               https://developer.cisco.com/docs/licenses
+All use of the material herein must be in accordance with the terms of
+the License. All rights not expressly granted by the License are
+reserved. Unless required by applicable law or agreed to separately in
+writing, software distributed under the License is distributed on an "AS
+IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+or implied.
+"""
+
+__author__ = "Mark Orszycki <morszyck@cisco.com>"
+__copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
+__license__ = "Cisco Sample Code License, Version 1.1"
+
+import asyncio
+import time as time_module
+
+from database.crud import CRUDOperations, call_crud
+from logger.logrr import lm
+
+GEOLOCATION_QUEUE_MAX_BATCH = 64  # Maximum number of geolocation updates written per transaction
+GEOLOCATION_QUEUE_FLUSH_INTERVAL = 0.05  # Seconds to wait for more updates before flushing a partial batch
+
+geolocation_queue = asyncio.Queue(maxsize=1024)  # Pending geolocation updates, drained by geolocation_writer (in memory only, lost if the process dies)
+
+
+async def queue_geolocation_update(user_id: str, session_token: str, time: str, latitude: float, longitude: float):
+    """
+    Queue an AllowList geolocation update for the batch writer. The update is timestamped now, not when it is flushed.
+    """
+    await geolocation_queue.put({
+        "user_id": user_id,
+        "session_token": session_token,
+        "time": time,
+        "latitude": latitude,
+        "longitude": longitude,
+        "last_update": time_module.time(),
+    })
+
+
+def flush_geolocation_updates(entries) -> bool:
+    """
+    Write a batch of geolocation updates in one transaction (blocking DB call, run in the executor).
+    Returns True if the batch was committed; failures are logged here, the routes have already answered.
+    """
+    try:
+        committed = call_crud(CRUDOperations.update_time_location_entries, entries)  # Removes the thread's session afterwards, returning the connection to the pool
+    except Exception as e:
+        lm.lnp(f"Error flushing {len(entries)} geolocation updates to the database: {e}", style='error', level='error')
+        return False
+    if not committed:
+        lm.lnp(f"Commit of {len(entries)} geolocation updates failed, the batch was rolled back and is lost", style='error', level='error')
+    return committed
+
+
+async def geolocation_writer():
+    """
+    Drain the geolocation queue, flushing every GEOLOCATION_QUEUE_MAX_BATCH updates or GEOLOCATION_QUEUE_FLUSH_INTERVAL seconds.
+    When cancelled (shutdown), the batch in flight is written before the task ends, so await the task before
+    flush_pending_geolocation_updates.
+    """
+    loop = asyncio.get_running_loop()
+    entries = []  # Updates taken off the queue, not yet handed to the executor
+    executor_flush = None  # Batch being written on an executor thread
+    try:
+        while True:
+            entries = [await geolocation_queue.get()]  # Wait for the first update of the next batch
+            deadline = loop.time() + GEOLOCATION_QUEUE_FLUSH_INTERVAL
+            while len(entries) < GEOLOCATION_QUEUE_MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entries.append(await asyncio.wait_for(geolocation_queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+            executor_flush = loop.run_in_executor(None, flush_geolocation_updates, entries)
+            entries = []
+            await asyncio.shield(executor_flush)  # A cancel must not abandon the batch while its thread is still writing
+            executor_flush = None
+    except asyncio.CancelledError:
+        if executor_flush is not None:
+            await executor_flush  # Let the running write finish, so it cannot overwrite the newer updates flushed after it
+        if entries:
+            flush_geolocation_updates(entries)  # Blocking, only on shutdown
+        raise
+
+
+def flush_pending_geolocation_updates():
+    """Write any updates still queued, on shutdown after the writer task has been cancelled and awaited."""
+    entries = []
+    while not geolocation_queue.empty():
+        entries.append(geolocation_queue.get_nowait())
+    if entries:
+        flush_geolocation_updates(entries)
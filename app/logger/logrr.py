@@ -20,13 +20,12 @@ from rich.console import Console
 from rich.pretty import Pretty
 from rich.table import Table
 from rich.panel import Panel
+import functools
 import logging
 import logging.handlers
 import queue
-from rich.logging import RichHandler
 from logging.handlers import TimedRotatingFileHandler
 from rich import inspect
-from threading import Lock
 import os
 from .custom_themes import ct
 
@@ -34,36 +33,36 @@ from .custom_themes import ct
 class LoggerManager:
     """
     Logger Manager class to manage logging and console output.
+    Use the module-level lm instance, created once under the import lock.
     """
-    _instance = None
-    _lock = Lock()
-
-    def __new__(cls, *args, **kwargs):
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(LoggerManager, cls).__new__(cls)
-            return cls._instance
 
     def __init__(self):
         self.listener = None
-        self.console = Console(theme=ct)  # Uses custom themes Class
-        self.log_queue = queue.Queue(-1)  # No limit on size
+        self.console = Console(theme=ct, highlight=False)  # Uses custom themes Class, no per-message regex highlighting
+        self.log_queue = queue.SimpleQueue()  # Unbounded C-implemented queue, no task bookkeeping or Python-level locking
         self.queue_handler = logging.handlers.QueueHandler(self.log_queue)
         self.log_dir = "logger/logs"
         self.log_file = self.log_dir + "/app.log"
         self.logger = self.setup()
+        self._level_methods = {  # Log methods resolved once, lnp looks the level up here instead of getattr per call
+            'debug': self.logger.debug,
+            'info': self.logger.info,
+            'warning': self.logger.warning,
+            'error': self.logger.error,
+            'critical': self.logger.critical,
+        }
         self.original_log_level = self.logger.level
         self.session_logs = {}  # This will store all the logs per session
         self.logger.propagate = False
-        self.lock = Lock()
 
     def setup(self):
-        """Set up the logger with handlers for both console and file output."""
+        """
+        Set up the logger. Records are put on a queue by the calling thread and written to the log file by the
+        listener thread; console output is printed by lnp / tsp directly.
+        """
         log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-        log_directory = self.log_dir  # Create the log directory if it doesn't exist
-        if not os.path.exists(log_directory):  # Create the log directory if it doesn't exist
-            os.makedirs(log_directory)  # Create the log directory if it doesn't exist
+        os.makedirs(self.log_dir, exist_ok=True)  # Create the log directory if it doesn't exist
 
         file_handler = logging.FileHandler(self.log_file)  # Create a file handler
 
@@ -77,45 +76,57 @@ class LoggerManager:
         # )
         file_handler.setLevel(logging.DEBUG)  # Set the file handler level to DEBUG
         file_handler.setFormatter(logging.Formatter(log_format))  # Set the file handler format
-
-        console_handler = RichHandler(console=self.console, rich_tracebacks=True)  # Create a console handler
-        console_handler.setLevel(logging.DEBUG)  # Set the console handler level to DEBUG
+        # Buffer file records and write them in batches; errors (and anything buffered before them) are written immediately
+        self.file_buffer = logging.handlers.MemoryHandler(capacity=512, flushLevel=logging.ERROR, target=file_handler)
+        self.file_buffer.setLevel(logging.DEBUG)
 
         logger = logging.getLogger(__name__)  # Get the logger
         logger.setLevel(logging.DEBUG)
-        logger.addHandler(file_handler)  # Add the file handler to the logger
+        logger.addHandler(self.queue_handler)  # Only enqueue on the calling thread, the listener does the file I/O
         logger.propagate = False
 
+        # No console handler: lnp already prints every message, a console handler here would print each one twice
         self.listener = logging.handlers.QueueListener(
-            self.log_queue, console_handler, file_handler, respect_handler_level=True
+            self.log_queue, self.file_buffer, respect_handler_level=True
         )
         self.listener.start()  # Start the listener
         return logger  # Return the logger
 
+    def shutdown(self):
+        """Drain the log queue and write buffered file log records to the log file."""
+        self.listener.stop()  # Processes the records still on the queue before returning
+        self.file_buffer.flush()
+
     def tsp(self, *args, **kwargs):
-        """Thread safe print."""
-        with self.lock:  # Use the lock to ensure thread safety
-            self.console.print(*args, **kwargs)  # Print the args
+        """Thread safe print. Console renders into a thread-local buffer and writes it out under its own lock."""
+        self.console.print(*args, **kwargs)  # Print the args
 
     def pp(self, *args, style="info", level="info"):
         """Pretty printing with thread safe print."""
         # Check if there are arguments to print
         if args:
-            pretty_args = Pretty(args)  # Format the args using Pretty
-            self.tsp(pretty_args)  # Print the pretty-formatted args
-            # Convert the args to a single string for logging
-            message = ' '.join(map(str, args))
-            self.lnp(message, style=style, level=level)  # Log the message
-
-    def lnp(self, message, style="info", level="info", **kwargs):
+            with self.console:  # Keep both prints in this thread's console buffer and write them out together
+                pretty_args = Pretty(args)  # Format the args using Pretty
+                self.tsp(pretty_args)  # Print the pretty-formatted args
+                # Convert the args to a single string for logging
+                message = ' '.join(map(str, args))
+                self.lnp(message, style=style, level=level)  # Log the message
+
+    def lnp(self, message, *args, style="info", level="info", **kwargs):
         """ Log n' print the message
-        Log the message at the given level and print it to the console with the given style."""
-        level_method = getattr(self.logger,  # Get the method from the logger
-                               level.lower(),  # Convert the level to lowercase
-                               self.logger.info  # Default to info if the level is not found
-                               )
+        Log the message at the given level and print it to the console with the given style.
+        Like logging, the message may be a %-format string with args; it is formatted once, the console prints every
+        message anyway, and the result is both logged and printed."""
+        if args:
+            message = message % args
+        level_method = self._level_methods.get(level, self.logger.info)  # Default to info if the level is not found
         level_method(message, **kwargs)  # Log the message
-        self.tsp(message, style=style, **kwargs)  # Print the message
+        if isinstance(message, str):
+            # Log messages are plain text, so skip Rich's markup and emoji parsing of the string; it also keeps
+            # values like "[...]" from being read as markup
+            self.tsp(message, style=style, markup=False, emoji=False, **kwargs)
+        else:
+            self.tsp(message, style=style, **kwargs)  # Renderables such as Panels keep their markup
 
     def p_panel(self, *args, **kwargs):
         """Create and print a Rich Panel in a thread-safe manner."""
@@ -132,17 +143,33 @@ class LoggerManager:
         """
         Display data in a rich table format.
         """
+        self.tsp(self.build_2_column_rich_table(data, title))
+
+    @staticmethod
+    def build_2_column_rich_table(data, title: str = "Table Name") -> Table:
+        """
+        Build a rich table with a Variable and a Value column from (name, value) pairs.
+        """
         table = Table(title=title)
         table.add_column("Variable", justify="left", style="bright_white", width=30)
         table.add_column("Value", style="bright_white", width=60)
 
         for var_name, var_value in data:
             table.add_row(var_name, str(var_value) if var_value not in [None, ""] else "Not Set")
-        self.tsp(table)
+        return table
 
     def print_config_table(self, config_instance: object):
+        self.tsp(self.config_table(config_instance))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def config_table(config_instance: object) -> Table:
+        """
+        Build the environment variables table once per Config instance; a Config is sealed after loading, so its
+        env_vars never change and the table can be reused. reload_config creates a new instance.
+        """
         config_data = [(name, value) for name, value in config_instance.env_vars.items()]
-        self.print_2_column_rich_table(data=config_data, title="Environment Variables & Settings")
+        return LoggerManager.build_2_column_rich_table(data=config_data, title="Environment Variables & Settings")
 
     def display_list_as_rich_table(self, data_list, title, headers=None):
         """Display a list of dictionaries in a rich table format."""
@@ -162,8 +189,9 @@ class LoggerManager:
         self.lnp(Panel.fit(f'[bold bright_white]{app_name}[/bold bright_white]', title='Start', style='webex'))
 
     def print_exit_panel(self):
-        self.lnp("\n")
-        self.lnp(Panel.fit('Shutting down...', title='[bright_red]Exit[/bright_red]', border_style='red'))
+        with self.console:  # One write for both prints
+            self.lnp("\n")
+            self.lnp(Panel.fit('Shutting down...', title='[bright_red]Exit[/bright_red]', border_style='red'))
 
     def debug_inspect(self, obj):
         """
@@ -186,8 +214,8 @@ class LoggerManager:
         )
 
     def print_xsi_user_map(self, xsi_user_map):
-        # Convert the xsi_user_map dictionary to a list of dictionaries
-        data_list = [value for value in xsi_user_map.values()]
+        # Convert the xsi_user_map UserEntry values to a list of dictionaries
+        data_list = [value._asdict() for value in xsi_user_map.values()]
 
         # Print the data in a table format
         self.display_list_as_rich_table(data_list, title="XSI User Map")
@@ -199,4 +227,4 @@ class LoggerManager:
             table.add_row(*row)
 
 
-lm = LoggerManager()
+lm = LoggerManager()  # Module-level singleton
@@ -18,22 +18,28 @@ __license__ = "Cisco Sample Code License, Version 1.1"
 
 from fastapi import FastAPI
 import uvicorn
-from routes import webex_router
+from routes import webex_router, limiter
 from config.config import c
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-import os
+from fastapi.responses import ORJSONResponse
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
 from logger.logrr import lm
-from starlette.middleware.sessions import SessionMiddleware
-from databases import Database
-from sqlalchemy import create_engine
 from app.database.models import Base
+from app.database.db import engine
+from app.database.crud import fold_time_locations_into_allow_list
 from call_monitor import start_call_monitoring
+from webex_api import close_webex_http_client
+from geolocation_writer import geolocation_writer, flush_pending_geolocation_updates
+import asyncio
 
 
 def create_app() -> FastAPI:
-    os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'  # Allows use of localhost for testing Oauth flow
-    fastapi_app = FastAPI(title=c.APP_NAME, version=c.APP_VERSION)  # Create the FastAPI app
+    fastapi_app = FastAPI(title=c.APP_NAME, version=c.APP_VERSION, default_response_class=ORJSONResponse)  # Create the FastAPI app, serializing responses with orjson
+
+    fastapi_app.state.limiter = limiter  # Rate limiter used by the OAuth and geolocation routes
+    fastapi_app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)  # Respond 429 when a limit is exceeded
 
     # Add CORS middleware
     fastapi_app.add_middleware(
@@ -44,31 +50,44 @@ def create_app() -> FastAPI:
         allow_headers=["*"],  # Allows all headers
     )
 
-    database = Database(c.SQLALCHEMY_DATABASE_URL)  # Create the database object
-    engine = create_engine(c.SQLALCHEMY_DATABASE_URL)  # Create the database engine
+    database = {}  # databases.Database connection, created on startup
+    background_tasks = set()  # Keep references to long-running tasks so they are not garbage collected
 
     @fastapi_app.on_event("startup")
     async def on_startup():
         lm.print_start_panel(app_name=c.APP_NAME)  # Print the start info message to console
         lm.print_admin_start_panel(public_url=c.PUBLIC_URL)  # Print the start info message to console
         # lm.print_config_table(config_instance=c)  # Print the config table to console
-        await database.connect()  # Connect to the database
-        Base.metadata.create_all(bind=engine)  # Create tables in the database
+        from databases import Database  # Deferred import, only needed once the app starts serving
+        database["connection"] = Database(c.SQLALCHEMY_DATABASE_URL)  # Create the database object
+        await database["connection"].connect()  # Connect to the database
+        if getattr(c, 'RUN_MIGRATIONS', True):  # Schema DDL round-trips only when enabled in settings.py
+            Base.metadata.create_all(bind=engine)  # Create tables in the database
+            fold_time_locations_into_allow_list(engine)  # Move geolocation data of databases created with the time_locations table
+            for table in Base.metadata.sorted_tables:  # create_all skips existing tables, so add any indexes they are missing
+                for index in table.indexes:
+                    index.create(bind=engine, checkfirst=True)
+        background_tasks.add(asyncio.create_task(geolocation_writer()))  # Start the batched geolocation writer
 
         # Uncomment the following lines to start call monitoring upon app startup if admin token in DB is present & valid
         # try:
         #     await start_call_monitoring()
         # except Exception as e:
         #     lm.error(f"Error starting call monitoring: {e}")
-        fastapi_app.mount("/static", StaticFiles(directory="static"), name="static")  # Serve static files
 
     @fastapi_app.on_event("shutdown")
     async def on_shutdown():
         lm.print_exit_panel()  # Print the exit info message to console
-        await database.disconnect()  # Disconnect from the database
+        for task in background_tasks:
+            task.cancel()  # Stop the batched geolocation writer
+        await asyncio.gather(*background_tasks, return_exceptions=True)  # Wait for the writer to write its in-flight batch
+        flush_pending_geolocation_updates()  # Persist geolocation updates still waiting in the queue
+        await database["connection"].disconnect()  # Disconnect from the database
+        await close_webex_http_client()  # Close the pooled Webex API connections
+        lm.shutdown()  # Write queued and buffered log records to the log file
 
     fastapi_app.include_router(webex_router)  # Include the router
-    fastapi_app.add_middleware(SessionMiddleware, secret_key=c.APP_SECRET_KEY)  # Add session middleware
+    fastapi_app.mount("/static", StaticFiles(directory="static"), name="static")  # Serve static files, mounted once when the app is created
     return fastapi_app
 
 
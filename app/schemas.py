@@ -16,14 +16,28 @@ __author__ = "Mark Orszycki <morszyck@cisco.com>"
 __copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
 __license__ = "Cisco Sample Code License, Version 1.1"
 
-from pydantic import BaseModel, Field
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TimeLocationData(BaseModel):
     """
-    Pydantic model for the TimeLocation data.
+    Pydantic model for the TimeLocation data. Validated on every geolocation update, so in strict mode: no type
+    coercion, unknown fields are rejected and instances are immutable.
     """
+    model_config = ConfigDict(strict=True, extra='forbid', frozen=True)
+
     sessionToken: str = Field(..., alias='sessionToken')    # Webex session token
     time: str   # Time in HH:MM format
     latitude: float    # Latitude
     longitude: float    # Longitude
+
+
+class AuthCookies(BaseModel):
+    """
+    Pydantic model for the authentication cookies, parsed once per request by the auth_cookies dependency.
+    """
+    session_token: Optional[str] = None    # Web session token of the user / admin
+    is_admin_authenticated: bool = False    # Set by the admin OAuth callback
+    oauth_state: Optional[str] = None    # OAuth state set when the OAuth flow started
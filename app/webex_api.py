@@ -16,11 +16,102 @@ __author__ = "Mark Orszycki <morszyck@cisco.com>"
 __copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
 __license__ = "Cisco Sample Code License, Version 1.1"
 
-import requests
-import json
+import hashlib
+import time
+from urllib.parse import urlencode
+
+import httpx
+import orjson
 from logger.logrr import lm
 from config.config import c
 
+WEBEX_HTTP_TIMEOUT = 10.0  # Seconds
+
+# Console message per Webex API status code, built once instead of on every response
+WEBEX_STATUS_MESSAGES = {
+    200: '[bright_green]200: Webex Call Successful - Data retrieved or successfully modified[/bright_green]',
+    201: '[bright_green]201: Webex API Call Successful - Data retrieved or successfully modified[/bright_green]',
+    202: '[bright_green]202: Webex API Call Successful - Request accepted and processing (asynchronous operation)[/bright_green]',
+    203: '[bright_green]203: Webex API Call Successful - Request successful, no content to return[/bright_green]',
+    204: '[bright_green]204: Webex API Call Successful - Request successful, no content to return[/bright_green]',
+    400: '[red]400: Bad Request - The request was invalid or cannot be otherwise served[/red]',
+    401: '[red]401: Unauthorized - Authentication credentials were missing or incorrect[/red]',
+    403: '[red]403: Forbidden - The request is understood, but it has been refused or access is not allowed[/red]',
+    404: '[red]404: Not Found - The URI requested is invalid or the resource requested does not exist[/red]',
+    500: '[red]500: Internal Server Error - Something is broken on the server[/red]',
+    503: '[red]503: Service Unavailable - The server is currently unable to handle the request due to a temporary overload or maintenance[/red]'
+}
+WEBEX_SUCCESS_STATUS_CODES = frozenset({200, 201, 202, 203, 204})
+
+# people/me results per access token, the profile does not change within a token's lifetime in practice.
+# Only used from the event loop, so no lock is needed.
+PEOPLE_ME_CACHE_TTL = 300.0  # Seconds
+PEOPLE_ME_CACHE_MAX_SIZE = 1024
+people_me_cache = {}  # blake2b digest of the access token -> (expires_at, user info)
+
+
+def people_me_cache_key(access_token: str) -> bytes:
+    """ Cache key for an access token, so the tokens themselves are not kept in memory by the cache """
+    return hashlib.blake2b(access_token.encode(), digest_size=16).digest()
+
+
+def cache_people_me(cache_key: bytes, user_info: dict):
+    """ Store a people/me result, dropping the oldest entry when the cache is full """
+    if len(people_me_cache) >= PEOPLE_ME_CACHE_MAX_SIZE:
+        people_me_cache.pop(next(iter(people_me_cache)))  # Dicts keep insertion order, the first entry is the oldest
+    people_me_cache[cache_key] = (time.monotonic() + PEOPLE_ME_CACHE_TTL, user_info)
+
+# Shared by all MyWebex instances so connections to the Webex API are kept alive and reused across calls,
+# over HTTP/2 where the server offers it so concurrent calls are multiplexed on one connection
+webex_http_client = httpx.AsyncClient(
+    base_url=c.WEBEX_BASE_URL,
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=100, keepalive_expiry=60),
+    timeout=WEBEX_HTTP_TIMEOUT,
+)
+
+
+async def close_webex_http_client():
+    """ Close the pooled Webex API connections (app shutdown) """
+    await webex_http_client.aclose()
+
+
+def build_authorization_url_prefix(redirect_uri: str) -> str:
+    """
+    Build the Webex OAuth authorization URL once per redirect URI. Only the state differs between logins, so callers
+    append it to the returned prefix (states are URL-safe, no encoding needed).
+    Args:
+        redirect_uri (str): OAuth redirect URI registered for the integration.
+    """
+    query = urlencode({'response_type': 'code', 'client_id': c.CLIENT_ID, 'redirect_uri': redirect_uri, 'scope': ' '.join(c.SCOPE)})
+    return f'{c.AUTHORIZATION_BASE_URL}?{query}&state='
+
+
+async def request_oauth_token(**form_data) -> dict:
+    """
+    POST to the Webex token endpoint on the shared keep-alive client.
+    Args:
+        form_data: Grant specific form fields (grant_type, code / refresh_token, redirect_uri).
+    Returns:
+        dict: The token, with expires_at and scope added the way requests_oauthlib stored them.
+    """
+    response = await webex_http_client.post(c.TOKEN_URL, data={'client_id': c.CLIENT_ID, 'client_secret': c.CLIENT_SECRET, **form_data})
+    response.raise_for_status()
+    token = orjson.loads(response.content)
+    token['expires_at'] = time.time() + int(token['expires_in'])  # Absolute expiry, checked by is_token_expired
+    token.setdefault('scope', c.SCOPE)  # Webex does not always echo the granted scope
+    return token
+
+
+async def fetch_oauth_token(code: str, redirect_uri: str) -> dict:
+    """ Exchange the authorization code of an OAuth callback for an access token. """
+    return await request_oauth_token(grant_type='authorization_code', code=code, redirect_uri=redirect_uri)
+
+
+async def refresh_oauth_token(refresh_token: str) -> dict:
+    """ Get a new access token with the refresh token. """
+    return await request_oauth_token(grant_type='refresh_token', refresh_token=refresh_token)
+
 
 class MyWebex:
     """
@@ -34,76 +125,83 @@ class MyWebex:
             access_token (str): Webex API access token.
             webex_room_id (str, optional): ID of the Webex room to send messages to.
         """
-        self.base_url = c.WEBEX_BASE_URL
         self.access_token = access_token
         self.headers = {'Authorization': f'Bearer {self.access_token}', 'Content-Type': 'application/json'}
 
-    def webex_api_call(self, method, endpoint, data=None):
+    async def webex_api_call(self, method, endpoint, data=None, parse_json=True):
         """
-        Generic function to make API calls to Webex.
+        Generic function to make API calls to Webex, on the shared keep-alive client without blocking the event loop.
         Args:
             method (str): HTTP method ('get', 'post', 'delete', etc.).
-            endpoint (str): API endpoint url.
+            endpoint (str): API endpoint path, relative to WEBEX_BASE_URL.
             data (dict, optional): Payload for POST requests.
+            parse_json (bool, optional): Log the status and return the decoded content. False returns the raw response,
+                for callers that only need the status code.
         Returns:
-            Response object: The response from the Webex API.
+            dict | str | None: The decoded content of a successful call (None if it failed), or the Response object
+                if parse_json is False.
         """
-        url = f'{self.base_url}/{endpoint}'
-        # lm.p_panel(f"url: {url}, headers: {self.headers}, endpoint: {endpoint}")  # debugging
-        response = requests.request(method, url, headers=self.headers, json=data)
-        self.handle_response(response)
-        return response
-
-    def handle_response(self, response):
-        status_code_messages = {
-            200: '[bright_green]200: Webex Call Successful - Data retrieved or successfully modified[/bright_green]',
-            201: '[bright_green]201: Webex API Call Successful - Data retrieved or successfully modified[/bright_green]',
-            202: '[bright_green]202: Webex API Call Successful - Request accepted and processing (asynchronous operation)[/bright_green]',
-            203: '[bright_green]203: Webex API Call Successful - Request successful, no content to return[/bright_green]',
-            204: '[bright_green]204: Webex API Call Successful - Request successful, no content to return[/bright_green]',
-            400: '[red]400: Bad Request - The request was invalid or cannot be otherwise served[/red]',
-            401: '[red]401: Unauthorized - Authentication credentials were missing or incorrect[/red]',
-            403: '[red]403: Forbidden - The request is understood, but it has been refused or access is not allowed[/red]',
-            404: '[red]404: Not Found - The URI requested is invalid or the resource requested does not exist[/red]',
-            500: '[red]500: Internal Server Error - Something is broken on the server[/red]',
-            503: '[red]503: Service Unavailable - The server is currently unable to handle the request due to a temporary overload or maintenance[/red]'
-        }
-
-        # Print the corresponding message for the status code
-        lm.console.print(
-            status_code_messages.get(response.status_code, f'Error handling Webex API call. Status Code: {response.status_code}. Response: {response.text}'))
-
-        # Handle JSON content if the response is successful
-        if response.status_code in [200, 201, 202, 203, 204]:
+        # lm.p_panel(f"headers: {self.headers}, endpoint: {endpoint}")  # debugging
+        response = await webex_http_client.request(method, endpoint, headers=self.headers, json=data)
+        if not parse_json:
+            return response
+        self._log_status(response)
+        return self._parse_json(response)
+
+    @staticmethod
+    def _log_status(response):
+        """ Print the corresponding console message for the status code of a Webex API response """
+        message = WEBEX_STATUS_MESSAGES.get(response.status_code)
+        if message is None:
+            message = f'Error handling Webex API call. Status Code: {response.status_code}. Response: {response.text}'
+        lm.console.print(message)
+
+    @staticmethod
+    def _parse_json(response):
+        """ Decode the JSON content of a successful Webex API response (None if the call failed) """
+        if response.status_code in WEBEX_SUCCESS_STATUS_CODES:
             try:
-                return response.json()
-            except json.JSONDecodeError:
+                return orjson.loads(response.content)
+            except orjson.JSONDecodeError:
                 return response.text  # For responses without JSON content
+        return None
 
-    def check_token_validity(self):
+    async def check_token_validity(self):
         """
         Check if the provided Webex access token is valid.
         Returns:
             bool: True if the token is valid, False otherwise.
         """
-        response = self.webex_api_call('get', 'people/me')
+        response = await self.webex_api_call('get', 'people/me', parse_json=False)  # Only the status code is needed
         if response.status_code == 200:
             return True
         else:
+            if response.status_code == 401:
+                people_me_cache.pop(people_me_cache_key(self.access_token), None)  # The token is no longer valid
             lm.logger.error(f'Invalid or expired token. Response: {response.text}')
             return False
 
-    def get_user_info(self):
+    async def get_user_info(self):
         """
-        Fetches the user's information from the Webex API.
+        Fetches the user's information from the Webex API, cached per access token for PEOPLE_ME_CACHE_TTL seconds.
         Returns:
             dict: User information.
         """
+        cache_key = people_me_cache_key(self.access_token)
+        cached = people_me_cache.get(cache_key)
+        if cached is not None and time.monotonic() < cached[0]:
+            return dict(cached[1])  # Copy, callers may modify the returned dict
+
         endpoint = 'people/me'
-        response = self.webex_api_call('GET', endpoint)
-        return self.handle_response(response)
+        response = await self.webex_api_call('GET', endpoint, parse_json=False)
+        self._log_status(response)
+        user_info = self._parse_json(response)
+        if isinstance(user_info, dict):
+            cache_people_me(cache_key, dict(user_info))
+        else:
+            people_me_cache.pop(cache_key, None)  # Expired entry or invalid token (401), do not keep it
+        return user_info
 
-    def get_person_details(self, person_id):
+    async def get_person_details(self, person_id):
         endpoint = f'people/{person_id}'
-        response = self.webex_api_call('GET', endpoint)
-        return self.handle_response(response)
+        return await self.webex_api_call('GET', endpoint)